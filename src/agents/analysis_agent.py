@@ -1,88 +1,178 @@
 """
 Analysis agent for synthesizing research information.
 """
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.agents.prompts import split_prompt, with_preamble
+from src.config import gemini_chat, settings
+
+# Constant instructions are sent as the system prompt, ahead of the per-call
+# sources, so the provider can reuse the cached prefix across requests.
+ANALYSIS_SYSTEM_PROMPT = """Analyze the research sources provided by the user and provide key insights.
+
+Please provide:
+1. Main themes and patterns
+2. Key findings
+3. Contradictions or discrepancies (if any)
+4. Confidence level in the findings
+5. Gaps or areas needing further research"""
+
+REDUCE_SYSTEM_PROMPT = """Combine the partial analyses provided by the user into a single analysis. Each partial analysis covers a different subset of the research sources.
+
+Please provide:
+1. Main themes and patterns
+2. Key findings
+3. Contradictions or discrepancies (if any), including between partial analyses
+4. Confidence level in the findings
+5. Gaps or areas needing further research"""
+
+# Prompt templates are parsed once at import and only filled in per call
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", with_preamble(ANALYSIS_SYSTEM_PROMPT)),
+    ("human", "Research sources:\n{context}")
+])
+
+REDUCE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", with_preamble(REDUCE_SYSTEM_PROMPT)),
+    ("human", "{partials}")
+])
+
+# The constant system messages are rendered once; each call only formats the
+# human message holding the sources or partial analyses
+ANALYSIS_SYSTEM_MESSAGE, ANALYSIS_HUMAN_TEMPLATE = split_prompt(ANALYSIS_PROMPT)
+REDUCE_SYSTEM_MESSAGE, REDUCE_HUMAN_TEMPLATE = split_prompt(REDUCE_PROMPT)
 
 
 class AnalysisAgent:
     """Agent for analyzing and synthesizing research data."""
 
-    def __init__(self, api_key: str):
-        """Initialize analysis agent."""
+    def __init__(self, api_key: str, llm_semaphore: Optional[asyncio.Semaphore] = None):
+        """
+        Initialize analysis agent.
+        
+        Args:
+            api_key: Google API key
+            llm_semaphore: Optional semaphore shared with other agents; one
+                permit is held per Gemini call, including each shard call
+        """
         self.api_key = api_key
+        self._llm = None
+        self._llm_semaphore = llm_semaphore or asyncio.Semaphore(settings.max_concurrent_llm_calls)
 
     async def analyze(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze and synthesize information from multiple sources.
         
+        Up to settings.analysis_shard_size sources are analyzed in a single
+        call. Larger source lists are split into shards that are analyzed
+        concurrently and then combined by a final reduce call.
+        
         Args:
             sources: List of source documents/results
             
         Returns:
             Dictionary with analysis results
         """
+        llm = self._get_llm()
+
         try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-        except ImportError:
-            raise ImportError(
-                "langchain-google-genai is not installed. "
-                "Install with: pip install langchain-google-genai"
-            )
-
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-3-pro-preview",
-            google_api_key=self.api_key,
-            temperature=0.5
-        )
+            if len(sources) <= settings.analysis_shard_size:
+                messages = self._build_messages(sources)
+            else:
+                messages = await self._build_reduce_messages(llm, sources)
+            analysis_text = await self._invoke(llm, messages)
+        except Exception as e:
+            return self._build_result(f"Analysis failed: {str(e)}", len(sources), "error")
+
+        return self._build_result(analysis_text, len(sources))
 
-        # Prepare context from sources
-        context = self._prepare_context(sources)
+    async def combine(self, partials: List[str], sources_count: int) -> Dict[str, Any]:
+        """
+        Combine analyses of disjoint source sets into a single analysis.
         
-        # Create analysis prompt
-        analysis_prompt = f"""Analyze the following research sources and provide key insights:
+        Args:
+            partials: Analysis texts, one per source set
+            sources_count: Total number of sources the partial analyses cover
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        try:
+            analysis_text = await self._invoke(self._get_llm(), self._build_reduce_prompt(partials))
+        except Exception as e:
+            return self._build_result(f"Analysis failed: {str(e)}", sources_count, "error")
 
-{context}
+        return self._build_result(analysis_text, sources_count)
 
-Please provide:
-1. Main themes and patterns
-2. Key findings
-3. Contradictions or discrepancies (if any)
-4. Confidence level in the findings
-5. Gaps or areas needing further research"""
+    async def _invoke(self, llm, messages: List[BaseMessage]) -> str:
+        """Run one LLM call while holding a shared LLM permit and return its text."""
+        async with self._llm_semaphore:
+            response = await llm.ainvoke(messages)
+        return response.content
 
-        try:
-            from langchain_core.messages import HumanMessage
-            
-            response = await llm.ainvoke([HumanMessage(content=analysis_prompt)])
-            analysis_text = response.content
-        except Exception as e:
-            analysis_text = f"Analysis failed: {str(e)}"
+    async def _build_reduce_messages(self, llm, sources: List[Dict[str, Any]]) -> List[BaseMessage]:
+        """Analyze source shards concurrently and build the messages combining them."""
+        shard_size = settings.analysis_shard_size
+        semaphore = asyncio.Semaphore(settings.analysis_shard_concurrency)
+
+        async def _analyze_shard(start: int) -> str:
+            shard = sources[start:start + shard_size]
+            async with semaphore, self._llm_semaphore:
+                response = await llm.ainvoke(self._build_messages(shard, start=start + 1))
+            return response.content
+
+        partials = await asyncio.gather(
+            *(_analyze_shard(start) for start in range(0, len(sources), shard_size))
+        )
+        return self._build_reduce_prompt(partials)
+
+    def _build_reduce_prompt(self, partials: List[str]) -> List[BaseMessage]:
+        """Build the messages combining several partial analyses."""
+        combined = "\n\n".join(
+            f"Partial analysis {i}:\n{partial}" for i, partial in enumerate(partials, 1)
+        )
+        return [REDUCE_SYSTEM_MESSAGE, HumanMessage(content=REDUCE_HUMAN_TEMPLATE.format(partials=combined))]
+
+    def _get_llm(self):
+        """Get the shared Gemini chat model at the analysis temperature, creating it on first use."""
+        if self._llm is None:
+            self._llm = gemini_chat("models/gemini-3-pro-preview", self.api_key, temperature=0.5)
+        return self._llm
 
+    def _build_messages(self, sources: List[Dict[str, Any]], start: int = 1) -> List[BaseMessage]:
+        """Build the analysis messages for a set of sources numbered from start."""
+        return [
+            ANALYSIS_SYSTEM_MESSAGE,
+            HumanMessage(content=ANALYSIS_HUMAN_TEMPLATE.format(context=self._prepare_context(sources, start)))
+        ]
+
+    def _build_result(
+        self,
+        analysis_text: str,
+        sources_count: int,
+        status: str = "completed"
+    ) -> Dict[str, Any]:
+        """Wrap analysis text in the agent result format."""
         return {
             "analysis": analysis_text,
-            "sources_count": len(sources),
+            "sources_count": sources_count,
             "agent_type": "analysis",
-            "status": "completed"
+            "status": status
         }
 
-    def _prepare_context(self, sources: List[Dict[str, Any]]) -> str:
-        """Prepare context string from sources."""
-        context_parts = []
-        for i, source in enumerate(sources, 1):
-            content = source.get("content", "")
-            title = source.get("title", "")
-            url = source.get("url", "")
-            
-            source_text = f"\nSource {i}:"
-            if title:
-                source_text += f"\nTitle: {title}"
-            if url:
-                source_text += f"\nURL: {url}"
-            source_text += f"\nContent: {content[:500]}..."  # Limit content length
-            
-            context_parts.append(source_text)
-        
-        return "\n".join(context_parts)
+    def _prepare_context(self, sources: List[Dict[str, Any]], start: int = 1) -> str:
+        """Prepare context string from sources, numbering them from start."""
+        # Build each source block in one expression; content is limited to 500 chars
+        return "\n".join(
+            f"\nSource {i}:"
+            + (f"\nTitle: {source['title']}" if source.get("title") else "")
+            + (f"\nURL: {source['url']}" if source.get("url") else "")
+            + f"\nContent: {source.get('content', '')[:500]}..."
+            for i, source in enumerate(sources, start)
+        )
 
     async def process(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -1,7 +1,11 @@
 """
 Document retrieval agent for querying vector database.
 """
-from typing import List, Dict, Any
+import asyncio
+import json
+from typing import List, Dict, Any, Optional
+from src.cache import AsyncTTLCache
+from src.config import settings
 from src.vector_store import get_vector_store
 
 
@@ -11,41 +15,133 @@ class DocumentAgent:
     def __init__(self):
         """Initialize document agent."""
         self.vector_store = get_vector_store()
+        self.search_results_cache = AsyncTTLCache(
+            maxsize=settings.search_cache_size,
+            ttl=settings.search_cache_ttl
+        )
 
-    async def search_documents(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    async def search_documents(
+        self,
+        query: str,
+        top_k: int = 5,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for relevant documents in the vector store.
         
         Args:
             query: The search query
             top_k: Number of top results to return
+            where_filter: Optional metadata filter applied by the vector store
+                before ranking, e.g. {"source": {"$eq": "report.pdf"}}
             
         Returns:
             List of relevant documents with scores
         """
+        filter_key = json.dumps(where_filter, sort_keys=True) if where_filter else None
+        return await self.search_results_cache.get_or_set(
+            (query, top_k, filter_key),
+            lambda: self._search_vector_store(query, top_k, where_filter),
+            cache_if=lambda results: not any("error" in result for result in results)
+        )
+
+    async def _search_vector_store(
+        self,
+        query: str,
+        top_k: int,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run an uncached vector store search."""
+        try:
+            results = await self.vector_store.search(query, k=top_k, where_filter=where_filter)
+            return self._format_results(results)
+        except Exception as e:
+            return self._error_results(e)
+
+    async def search_documents_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search the vector store for several queries, embedding them in one request.
+        
+        Queries with cached results are served from the cache; the rest go
+        through one vector store batch search, and their results are cached
+        for later single searches.
+        
+        Args:
+            queries: The search queries
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One list of relevant documents per query
+        """
+        uncached = [
+            query for query in dict.fromkeys(queries)
+            if self.search_results_cache.get((query, top_k, None)) is None
+        ]
+        batch = asyncio.ensure_future(self._search_vector_store_batch(uncached, top_k))
+        positions = {query: i for i, query in enumerate(uncached)}
+
+        async def _from_batch(query: str) -> List[Dict[str, Any]]:
+            if query not in positions:
+                # Evicted or expired since the check above
+                return await self._search_vector_store(query, top_k)
+            return (await asyncio.shield(batch))[positions[query]]
+
+        return list(await asyncio.gather(*(
+            self.search_results_cache.get_or_set(
+                (query, top_k, None),
+                lambda query=query: _from_batch(query),
+                cache_if=lambda results: not any("error" in result for result in results)
+            )
+            for query in queries
+        )))
+
+    async def _search_vector_store_batch(
+        self,
+        queries: List[str],
+        top_k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Run an uncached vector store batch search."""
+        if not queries:
+            return []
         try:
-            results = await self.vector_store.search(query, k=top_k)
-            return [
-                {
-                    "content": result.get("content", ""),
-                    "metadata": result.get("metadata", {}),
-                    "score": result.get("score", 0),
-                    "source": "document_db"
-                }
-                for result in results
-            ]
+            batch_results = await self.vector_store.search_batch(queries, k=top_k)
+            return [self._format_results(results) for results in batch_results]
         except Exception as e:
-            return [{
-                "content": "",
-                "error": f"Document search failed: {str(e)}",
-                "source": "document_db",
-                "score": 0.0
-            }]
+            return [self._error_results(e) for _ in queries]
+
+    def _format_results(self, results: List[Dict]) -> List[Dict[str, Any]]:
+        """Convert raw vector store matches into agent results."""
+        return [
+            {
+                "content": result.get("content", ""),
+                "metadata": result.get("metadata", {}),
+                "score": result.get("score", 0),
+                "source": "document_db"
+            }
+            for result in results
+        ]
+
+    def _error_results(self, error: Exception) -> List[Dict[str, Any]]:
+        """Build the single-item result list reported when a search fails."""
+        return [{
+            "content": "",
+            "error": f"Document search failed: {str(error)}",
+            "source": "document_db",
+            "score": 0.0
+        }]
 
     async def index_documents(self, texts: List[str], metadatas: List[Dict]) -> List[str]:
         """
         Index documents in the vector store.
         
+        Documents are embedded and upserted in batches of
+        settings.index_batch_size, with up to settings.index_concurrency
+        batches in flight at once.
+        
         Args:
             texts: List of document texts
             metadatas: List of metadata dictionaries
@@ -53,9 +149,26 @@ class DocumentAgent:
         Returns:
             List of document IDs
         """
+        batch_size = settings.index_batch_size
+        semaphore = asyncio.Semaphore(settings.index_concurrency)
+
+        async def _index_batch(start: int) -> List[str]:
+            batch_texts = texts[start:start + batch_size]
+            batch_ids = [f"doc_{start + i}" for i in range(len(batch_texts))]
+            async with semaphore:
+                return await self.vector_store.add_documents(
+                    batch_texts,
+                    metadatas[start:start + batch_size],
+                    ids=batch_ids
+                )
+
         try:
-            doc_ids = await self.vector_store.add_documents(texts, metadatas)
-            return doc_ids
+            batches = await asyncio.gather(
+                *(_index_batch(start) for start in range(0, len(texts), batch_size))
+            )
+            # Cached searches may no longer reflect the index contents
+            self.search_results_cache.clear()
+            return [doc_id for batch in batches for doc_id in batch]
         except Exception as e:
             raise RuntimeError(f"Failed to index documents: {str(e)}")
 
@@ -76,3 +189,24 @@ class DocumentAgent:
             "agent_type": "document_retrieval",
             "status": "completed"
         }
+
+    async def abatch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process several document retrieval queries as a single batch.
+        
+        Args:
+            queries: The research queries
+            
+        Returns:
+            List of retrieval result dictionaries, in the same order as queries
+        """
+        batch_results = await self.search_documents_batch(queries)
+        return [
+            {
+                "query": query,
+                "results": results,
+                "agent_type": "document_retrieval",
+                "status": "completed"
+            }
+            for query, results in zip(queries, batch_results)
+        ]
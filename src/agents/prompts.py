@@ -0,0 +1,46 @@
+"""
+Prompt text shared by the LLM-backed agents.
+"""
+from typing import Tuple, cast
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    PromptTemplate,
+    SystemMessagePromptTemplate,
+)
+
+# Identical leading text for every Gemini call made by the agents. Keep it
+# free of per-request values (dates, IDs, queries) so that all analysis,
+# reduce and report prompts share one cacheable prefix.
+SYSTEM_PREAMBLE = """You are part of an autonomous research system that answers research queries from web search results and indexed documents.
+
+Base every statement on the material provided by the user, say so when the material is insufficient, and do not invent sources."""
+
+
+def with_preamble(instructions: str) -> str:
+    """Prefix step-specific system instructions with the shared preamble."""
+    return f"{SYSTEM_PREAMBLE}\n\n{instructions}"
+
+
+def split_prompt(prompt: ChatPromptTemplate) -> Tuple[SystemMessage, str]:
+    """
+    Split a system/human prompt template for per-call formatting.
+    
+    The system message has no variables, so it is rendered once here;
+    callers only fill in the returned human template with str.format.
+    
+    Args:
+        prompt: Template holding a system message and a human message
+        
+    Returns:
+        The rendered system message and the human message template string
+    """
+    system, human = prompt.messages
+    if not (
+        isinstance(system, SystemMessagePromptTemplate)
+        and isinstance(human, HumanMessagePromptTemplate)
+        and isinstance(human.prompt, PromptTemplate)
+    ):
+        raise ValueError("Expected a system message template followed by a human message template")
+    return cast(SystemMessage, system.format()), human.prompt.template
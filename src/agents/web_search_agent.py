@@ -1,9 +1,12 @@
 """
 Web search agent for retrieving information from the internet.
 """
+import asyncio
 from typing import List, Dict, Any
-from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.tools import BaseTool, StructuredTool
+
+from src.cache import AsyncTTLCache
+from src.config import settings
 
 
 class WebSearchAgent:
@@ -12,9 +15,12 @@ class WebSearchAgent:
     def __init__(self, api_key: str):
         """Initialize web search agent."""
         self.api_key = api_key
-        self.search_results_cache = {}
+        self._client = None
+        self.search_results_cache = AsyncTTLCache(
+            maxsize=settings.search_cache_size,
+            ttl=settings.search_cache_ttl
+        )
 
-    @tool
     async def search_web(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """
         Search the web for information using Tavily API.
@@ -26,15 +32,18 @@ class WebSearchAgent:
         Returns:
             List of search results with title, URL, and content
         """
-        try:
-            from tavily import TavilyClient
-        except ImportError:
-            raise ImportError("tavily-python is not installed. Install with: pip install tavily-python")
+        return await self.search_results_cache.get_or_set(
+            (query, num_results),
+            lambda: self._search_tavily(query, num_results),
+            cache_if=lambda results: not any("error" in result for result in results)
+        )
 
-        client = TavilyClient(api_key=self.api_key)
+    async def _search_tavily(self, query: str, num_results: int) -> List[Dict[str, Any]]:
+        """Run an uncached Tavily search."""
+        client = self._get_client()
         
         try:
-            response = client.search(query, max_results=num_results)
+            response = await client.search(query, max_results=num_results)
             
             results = []
             for item in response.get("results", []):
@@ -55,6 +64,27 @@ class WebSearchAgent:
                 "score": 0.0
             }]
 
+    def as_tool(self) -> BaseTool:
+        """Expose search_web as a LangChain tool bound to this agent."""
+        return StructuredTool.from_function(
+            coroutine=self.search_web,
+            name="search_web",
+            description="Search the web for information using Tavily API."
+        )
+
+    def _get_client(self):
+        """Get the async Tavily client, creating it on first use so its connection pool is reused."""
+        if self._client is not None:
+            return self._client
+
+        try:
+            from tavily import AsyncTavilyClient
+        except ImportError:
+            raise ImportError("tavily-python is not installed. Install with: pip install tavily-python")
+
+        self._client = AsyncTavilyClient(api_key=self.api_key)
+        return self._client
+
     async def process(self, query: str) -> Dict[str, Any]:
         """
         Process a search query.
@@ -72,3 +102,24 @@ class WebSearchAgent:
             "agent_type": "web_search",
             "status": "completed"
         }
+
+    async def abatch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process several search queries concurrently.
+        
+        Results go through the search cache, so later runs for the same
+        queries reuse them.
+        
+        Args:
+            queries: The research queries
+            
+        Returns:
+            List of search result dictionaries, in the same order as queries
+        """
+        semaphore = asyncio.Semaphore(settings.max_batch_concurrency)
+
+        async def _process(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process(query)
+
+        return list(await asyncio.gather(*(_process(query) for query in queries)))
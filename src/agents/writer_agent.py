@@ -1,8 +1,55 @@
 """
 Writer agent for generating final research reports.
 """
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from datetime import datetime, timezone
+
+from src.agents.prompts import split_prompt, with_preamble
+from src.config import gemini_chat, settings
+
+# Fixed report instructions; only the query and analysis vary per call
+REPORT_SYSTEM_PROMPT = """Write a comprehensive research report based on the research query and analysis provided by the user.
+
+Please write a professional research report with the following structure:
+1. Executive Summary
+2. Introduction
+3. Key Findings
+4. Detailed Analysis
+5. Sources and References
+6. Conclusions and Recommendations
+
+Make it well-structured, professional, and suitable for presentation."""
+
+OUTLINE_SYSTEM_PROMPT = """Draft an outline for a research report on the research query provided by the user, given the titles of the sources found for it.
+
+List the section titles only, one per line, following this structure:
+1. Executive Summary
+2. Introduction
+3. Key Findings
+4. Detailed Analysis
+5. Sources and References
+6. Conclusions and Recommendations
+
+Under Key Findings and Detailed Analysis, name the subsections the sources suggest."""
+
+# Prompt templates are parsed once at import and only filled in per call
+REPORT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", with_preamble(REPORT_SYSTEM_PROMPT)),
+    ("human", "Research Query: {query}\n\nAnalysis and Findings:\n{analysis}")
+])
+
+OUTLINE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", with_preamble(OUTLINE_SYSTEM_PROMPT)),
+    ("human", "Research Query: {query}\n\nSource titles:\n{titles}")
+])
+
+# The constant system messages are rendered once; each call only formats the
+# human message
+REPORT_SYSTEM_MESSAGE, REPORT_HUMAN_TEMPLATE = split_prompt(REPORT_PROMPT)
+REPORT_OUTLINE_TEMPLATE = "\n\nDraft outline (adapt it to the findings):\n{outline}"
+OUTLINE_SYSTEM_MESSAGE, OUTLINE_HUMAN_TEMPLATE = split_prompt(OUTLINE_PROMPT)
 
 
 class WriterAgent:
@@ -11,13 +58,17 @@ class WriterAgent:
     def __init__(self, api_key: str):
         """Initialize writer agent."""
         self.api_key = api_key
+        self._llm = None
+        self._outline_llm = None
 
     async def write_report(
         self,
         query: str,
         analysis: str,
         sources: List[Dict[str, Any]],
-        web_results: List[Dict[str, Any]]
+        web_results: List[Dict[str, Any]],
+        on_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
+        outline: str = ""
     ) -> Dict[str, Any]:
         """
         Write a comprehensive research report.
@@ -27,54 +78,101 @@ class WriterAgent:
             analysis: Analysis from analysis agent
             sources: Retrieved documents
             web_results: Web search results
+            on_chunk: Optional callback awaited with each report chunk as it is generated
+            outline: Optional draft outline from draft_outline for the report to follow
             
         Returns:
             Dictionary with report content
         """
+        report_parts = []
+        status = "completed"
         try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-        except ImportError:
-            raise ImportError(
-                "langchain-google-genai is not installed. "
-                "Install with: pip install langchain-google-genai"
-            )
+            async for chunk in self.stream_report(query, analysis, outline):
+                report_parts.append(chunk)
+                if on_chunk is not None:
+                    await on_chunk(chunk)
+            report_content = "".join(report_parts)
+        except Exception as e:
+            report_content = f"Report generation failed: {str(e)}"
+            status = "error"
 
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-3-pro-preview",
-            google_api_key=self.api_key,
-            temperature=0.7
-        )
+        return self._build_result(query, report_content, sources, web_results, status)
 
-        # Prepare report prompt
-        report_prompt = f"""Write a comprehensive research report based on the following:
+    async def stream_report(self, query: str, analysis: str, outline: str = "") -> AsyncIterator[str]:
+        """
+        Stream a research report as it is generated.
+        
+        Args:
+            query: Original research query
+            analysis: Analysis from analysis agent
+            outline: Optional draft outline for the report to follow
+            
+        Yields:
+            Chunks of report text
+        """
+        llm = self._get_llm()
 
-Research Query: {query}
+        async for chunk in llm.astream(self._build_messages(query, analysis, outline)):
+            if chunk.content:
+                yield chunk.content
 
-Analysis and Findings:
-{analysis}
+    async def draft_outline(self, query: str, titles: List[str]) -> str:
+        """
+        Draft the report's section titles from the query and source titles.
+        
+        Only needs the retrieval results, so it can run while the sources
+        are still being analyzed.
+        
+        Args:
+            query: Original research query
+            titles: Titles (or URLs) of the retrieved sources
+            
+        Returns:
+            Outline text, or an empty string if drafting failed
+        """
+        messages = [
+            OUTLINE_SYSTEM_MESSAGE,
+            HumanMessage(content=OUTLINE_HUMAN_TEMPLATE.format(query=query, titles="\n".join(titles)))
+        ]
+        try:
+            response = await self._get_outline_llm().ainvoke(messages)
+            return response.content
+        except Exception:
+            # The outline is only a hint; the report is written without one
+            return ""
 
-Please write a professional research report with the following structure:
-1. Executive Summary
-2. Introduction
-3. Key Findings
-4. Detailed Analysis
-5. Sources and References
-6. Conclusions and Recommendations
+    def _get_llm(self):
+        """Get the shared Gemini chat model at the report temperature, creating it on first use."""
+        if self._llm is None:
+            self._llm = gemini_chat("models/gemini-3-pro-preview", self.api_key, temperature=0.7)
+        return self._llm
 
-Make it well-structured, professional, and suitable for presentation."""
+    def _get_outline_llm(self):
+        """Get the shared faster Gemini chat model used for draft outlines, on first use."""
+        if self._outline_llm is None:
+            self._outline_llm = gemini_chat(settings.outline_model, self.api_key, temperature=0.3)
+        return self._outline_llm
 
-        try:
-            from langchain_core.messages import HumanMessage
-            
-            response = await llm.ainvoke([HumanMessage(content=report_prompt)])
-            report_content = response.content
-        except Exception as e:
-            report_content = f"Report generation failed: {str(e)}"
+    def _build_messages(self, query: str, analysis: str, outline: str = "") -> List[BaseMessage]:
+        """Build the report messages for a query, its analysis and an optional outline."""
+        content = REPORT_HUMAN_TEMPLATE.format(query=query, analysis=analysis)
+        if outline:
+            content += REPORT_OUTLINE_TEMPLATE.format(outline=outline)
+        return [REPORT_SYSTEM_MESSAGE, HumanMessage(content=content)]
 
+    def _build_result(
+        self,
+        query: str,
+        report_content: str,
+        sources: List[Dict[str, Any]],
+        web_results: List[Dict[str, Any]],
+        status: str = "completed"
+    ) -> Dict[str, Any]:
+        """Wrap report content and metadata in the agent result format."""
         # Create report metadata
         report_metadata = {
             "query": query,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
             "sources_count": len(sources),
             "web_results_count": len(web_results),
             "agent_type": "writer"
@@ -84,7 +182,7 @@ Make it well-structured, professional, and suitable for presentation."""
             "title": f"Research Report: {query[:50]}",
             "content": report_content,
             "metadata": report_metadata,
-            "status": "completed"
+            "status": status
         }
 
     async def process(
@@ -92,7 +190,9 @@ Make it well-structured, professional, and suitable for presentation."""
         query: str,
         analysis: str,
         sources: List[Dict[str, Any]],
-        web_results: List[Dict[str, Any]]
+        web_results: List[Dict[str, Any]],
+        on_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
+        outline: str = ""
     ) -> Dict[str, Any]:
         """
         Process inputs to generate a final report.
@@ -102,8 +202,10 @@ Make it well-structured, professional, and suitable for presentation."""
             analysis: Analysis results
             sources: Retrieved documents
             web_results: Web search results
+            on_chunk: Optional callback awaited with each report chunk
+            outline: Optional draft outline for the report to follow
             
         Returns:
             Dictionary with report
         """
-        return await self.write_report(query, analysis, sources, web_results)
+        return await self.write_report(query, analysis, sources, web_results, on_chunk, outline)
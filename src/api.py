@@ -1,23 +1,33 @@
 """
 FastAPI backend for the research agent.
 """
+import json
+import logging
 import uuid
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+from typing import Dict, Any, List, Optional, Set, Tuple, AsyncIterator, Awaitable
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import asyncio
+import msgspec
 
 from src.config import settings
 from src.orchestrator import ResearchOrchestrator
 from src.schemas import (
     ResearchQueryRequest,
+    ResearchBatchRequest,
     ResearchStatusResponse,
     ResearchReportResponse,
     ErrorResponse
 )
 from src.database import init_db
+from src.logging_config import setup_logging
+from src.result_store import get_result_store
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,15 +49,54 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and other resources."""
+    global research_queue, log_listener
+
+    log_listener = setup_logging(settings.log_level)
+
     try:
-        init_db()
-        print("Database initialized successfully")
-    except Exception as e:
-        print(f"Database initialization error: {e}")
+        await init_db()
+        logger.info("Database initialized successfully")
+    except Exception:
+        logger.exception("Database initialization error")
+
+    # Start the bounded pool of research workers
+    research_queue = asyncio.Queue()
+    research_workers.extend(
+        asyncio.create_task(_research_worker())
+        for _ in range(settings.max_concurrent_research)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop research workers and release shared resources."""
+    tasks = [*research_workers, *background_research]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    research_workers.clear()
+    await result_store.close()
+    await orchestrator.llm_cache.close()
 
+    if log_listener is not None:
+        log_listener.stop()
 
-# In-memory storage for research results (replace with DB in production)
-research_results: Dict[str, Dict[str, Any]] = {}
+
+# Background thread writing queued log records (started on startup)
+log_listener: Optional[QueueListener] = None
+
+# Research state shared across workers (Redis when configured)
+result_store = get_result_store()
+
+# Pending (query_id, query, shared result) research runs and the workers draining them
+research_queue: Optional["asyncio.Queue[Tuple[str, str, asyncio.Future]]"] = None
+research_workers: List[asyncio.Task] = []
+# Results of research runs queued or in progress, keyed by normalized query,
+# so duplicate submissions wait on the existing run instead of taking a worker
+inflight_research: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+# Tasks outside the worker pool: duplicates waiting to copy a shared run's
+# result, and batch retrievals that queue their queries once done
+background_research: Set[asyncio.Task] = set()
 
 # Initialize orchestrator
 orchestrator = ResearchOrchestrator()
@@ -61,7 +110,10 @@ async def root():
         "version": "0.1.0",
         "endpoints": {
             "research": "/api/research",
+            "batch": "/api/research/batch",
             "status": "/api/research/{query_id}",
+            "events": "/api/research/{query_id}/events",
+            "report_stream": "/api/research/{query_id}/report/stream",
             "health": "/health"
         }
     }
@@ -72,65 +124,222 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _utc_now_iso(),
         "version": "0.1.0"
     }
 
 
 @app.post("/api/research", response_model=ResearchStatusResponse)
-async def start_research(
-    request: ResearchQueryRequest,
-    background_tasks: BackgroundTasks
-):
+async def start_research(request: ResearchQueryRequest):
     """
     Start a research task.
     
     Args:
         request: Research query request
-        background_tasks: Background task manager
         
     Returns:
         Initial research status
     """
+    now_iso = _utc_now_iso()
+    query_id = await _create_research_entry(request.query, now_iso)
+    
+    await _submit_research(query_id, request.query)
+    
+    return ResearchStatusResponse(
+        query_id=query_id,
+        query=request.query,
+        status="running",
+        timestamp=now_iso
+    )
+
+
+@app.post("/api/research/batch", response_model=List[ResearchStatusResponse])
+async def start_research_batch(request: ResearchBatchRequest):
+    """
+    Start a research task for each query in a batch.
+    
+    Sources for the whole batch are retrieved together before the
+    queries are queued for the worker pool.
+    
+    Args:
+        request: Batch research request
+        
+    Returns:
+        Initial research status for each query, in request order
+    """
+    now_iso = _utc_now_iso()
+    entries = []
+    responses = []
+    for query in request.queries:
+        query_id = await _create_research_entry(query, now_iso)
+        entries.append((query_id, query))
+        responses.append(ResearchStatusResponse(
+            query_id=query_id,
+            query=query,
+            status="running",
+            timestamp=now_iso
+        ))
+    
+    _start_background(_run_research_batch(entries))
+    return responses
+
+
+def _utc_now_iso() -> str:
+    """Get the current UTC time as an ISO 8601 string."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def _create_research_entry(query: str, now_iso: str) -> str:
+    """Register a new running research query created at now_iso and return its ID."""
     query_id = str(uuid.uuid4())
     
     # Initialize research result
-    research_results[query_id] = {
-        "query": request.query,
+    await result_store.create(query_id, {
+        "query": query,
         "query_id": query_id,
         "status": "running",
         "web_results": [],
         "document_results": [],
         "analysis": None,
         "final_report": None,
-        "timestamp": datetime.utcnow().isoformat(),
-        "created_at": datetime.utcnow().isoformat()
-    }
+        "timestamp": now_iso,
+        "created_at": now_iso
+    })
     
-    # Run research in background
-    background_tasks.add_task(
-        _run_research_task,
-        query_id,
-        request.query
-    )
+    return query_id
+
+
+async def _submit_research(query_id: str, query: str):
+    """
+    Queue a research query, or attach it to an identical run already pending.
     
-    return ResearchStatusResponse(
-        query_id=query_id,
-        query=request.query,
-        status="running",
-        timestamp=datetime.utcnow().isoformat()
-    )
+    Only the query that started the run receives per-node results and
+    streamed report chunks as they are produced; attached duplicates get
+    the full results once the run completes, without taking a worker slot.
+    
+    Args:
+        query_id: ID of the research query being submitted
+        query: The research query
+    """
+    key = _research_key(query)
+    shared = inflight_research.get(key)
+    if shared is not None:
+        _start_background(_follow_research(query_id, query, shared))
+        return
+
+    if research_queue is None:
+        raise RuntimeError("Research workers are not running; the app has not started up")
+
+    shared = asyncio.get_running_loop().create_future()
+    inflight_research[key] = shared
+
+    def release(future: asyncio.Future):
+        if inflight_research.get(key) is future:
+            del inflight_research[key]
+        # Mark a failure as retrieved even when no duplicate was waiting on it
+        if not future.cancelled():
+            future.exception()
+
+    shared.add_done_callback(release)
+    # Queue research for the worker pool
+    await research_queue.put((query_id, query, shared))
+
+
+async def _run_research_batch(entries: List[Tuple[str, str]]):
+    """
+    Retrieve sources for a batch of queries together, then queue each query.
+    
+    The batch retrieval embeds all document queries in one request and
+    fills the agents' search caches, which the queued runs' retrieval
+    steps then read from.
+    
+    Args:
+        entries: (query_id, query) pairs of the batch, in request order
+    """
+    # Duplicates will attach to the first run, so retrieve once per query
+    leaders: Dict[str, str] = {}
+    for _, query in entries:
+        leaders.setdefault(_research_key(query), query)
+    try:
+        await orchestrator.retrieve_batch(list(leaders.values()))
+    except Exception:
+        # Each run still retrieves its own sources
+        logger.exception("Error in batch retrieval")
 
+    for query_id, query in entries:
+        await _submit_research(query_id, query)
+
+
+def _research_key(query: str) -> str:
+    """Normalize a query so duplicate submissions share one research run."""
+    return " ".join(query.lower().split())
+
+
+def _start_background(coro: Awaitable[None]):
+    """Run a task outside the worker pool, keeping a reference until it finishes."""
+    task = asyncio.ensure_future(coro)
+    background_research.add(task)
+    task.add_done_callback(background_research.discard)
+
+
+async def _research_worker():
+    """Run queued research tasks one at a time until cancelled."""
+    while True:
+        query_id, query, shared = await research_queue.get()
+        try:
+            await _run_research_task(query_id, query, shared)
+        except Exception:
+            logger.exception("Error in research worker")
+        finally:
+            research_queue.task_done()
+
+
+async def _run_research_task(query_id: str, query: str, shared: asyncio.Future):
+    """Run research task in background, publishing its result to attached duplicates."""
+    async def on_report_chunk(chunk: str):
+        await result_store.append_report_chunk(query_id, chunk)
+
+    async def on_node_update(node: str, update: Dict[str, Any]):
+        await result_store.update(query_id, update)
 
-async def _run_research_task(query_id: str, query: str):
-    """Run research task in background."""
     try:
-        result = await orchestrator.run_research(query)
-        research_results[query_id].update(result)
-        research_results[query_id]["status"] = "completed"
+        result = await orchestrator.run_research(
+            query,
+            on_report_chunk=on_report_chunk,
+            on_node_update=on_node_update
+        )
+    except asyncio.CancelledError:
+        shared.cancel()
+        raise
     except Exception as e:
-        research_results[query_id]["status"] = f"error: {str(e)}"
-        print(f"Error in research task: {str(e)}")
+        shared.set_exception(e)
+        await result_store.update(query_id, {"status": f"error: {str(e)}"})
+        logger.exception("Error in research task %s", query_id)
+        return
+
+    shared.set_result(result)
+    await _complete_research(query_id, query, result)
+
+
+async def _follow_research(query_id: str, query: str, shared: asyncio.Future):
+    """Copy the result of an identical research run into this query once it completes."""
+    try:
+        # Shield so cancelling one follower does not cancel the shared result
+        result = await asyncio.shield(shared)
+        await _complete_research(query_id, query, result)
+    except Exception as e:
+        await result_store.update(query_id, {"status": f"error: {str(e)}"})
+        logger.exception("Error in research task %s", query_id)
+
+
+async def _complete_research(query_id: str, query: str, result: Dict[str, Any]):
+    """Store a finished research workflow result under query_id."""
+    await result_store.update(query_id, {
+        **result,
+        "query_id": query_id,
+        "query": query,
+        "status": "completed"
+    })
 
 
 @app.get("/api/research/{query_id}", response_model=ResearchStatusResponse)
@@ -144,11 +353,10 @@ async def get_research_status(query_id: str):
     Returns:
         Current research status and results
     """
-    if query_id not in research_results:
+    result = await result_store.get(query_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Research query not found")
     
-    result = research_results[query_id]
-    
     return ResearchStatusResponse(
         query_id=query_id,
         query=result.get("query", ""),
@@ -157,7 +365,7 @@ async def get_research_status(query_id: str):
         document_results=result.get("document_results", []),
         analysis=result.get("analysis"),
         final_report=result.get("final_report"),
-        timestamp=result.get("timestamp", datetime.utcnow().isoformat())
+        timestamp=result.get("timestamp") or _utc_now_iso()
     )
 
 
@@ -176,7 +384,7 @@ async def index_documents(
     Returns:
         Index result
     """
-    if query_id not in research_results:
+    if not await result_store.exists(query_id):
         raise HTTPException(status_code=404, detail="Research query not found")
     
     try:
@@ -205,10 +413,9 @@ async def get_research_report(query_id: str):
     Returns:
         Final research report
     """
-    if query_id not in research_results:
+    result = await result_store.get(query_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Research query not found")
-    
-    result = research_results[query_id]
     final_report = result.get("final_report")
     
     if not final_report:
@@ -221,10 +428,114 @@ async def get_research_report(query_id: str):
         summary=final_report.get("summary"),
         web_results_count=len(result.get("web_results", [])),
         document_results_count=len(result.get("document_results", [])),
-        created_at=result.get("timestamp", datetime.utcnow().isoformat())
+        created_at=result.get("timestamp") or _utc_now_iso()
+    )
+
+
+@app.get("/api/research/{query_id}/report/stream")
+async def stream_research_report(query_id: str):
+    """
+    Stream the final research report as Server-Sent Events.
+    
+    Each ``data`` event carries a JSON-encoded chunk of report text as the
+    writer generates it; a final ``done`` event carries the research status.
+    
+    Args:
+        query_id: The research query ID
+        
+    Returns:
+        Streaming report response
+    """
+    if not await result_store.exists(query_id):
+        raise HTTPException(status_code=404, detail="Research query not found")
+    
+    return StreamingResponse(
+        _report_events(query_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
     )
 
 
+async def _report_events(query_id: str) -> AsyncIterator[str]:
+    """Relay report chunks from the result store until the research finishes."""
+    sent = 0
+    while True:
+        # Read status before chunks so no chunk written before completion is missed
+        status = await result_store.get_status(query_id) or "unknown"
+
+        chunks = await result_store.get_report_chunks(query_id, sent)
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        sent += len(chunks)
+
+        if status != "running":
+            # Reports produced without streaming (e.g. after a restart) arrive whole
+            if sent == 0:
+                final_report = (await result_store.get(query_id) or {}).get("final_report") or {}
+                if final_report.get("content"):
+                    yield f"data: {json.dumps(final_report['content'])}\n\n"
+            yield f"event: done\ndata: {json.dumps(status)}\n\n"
+            return
+
+        await asyncio.sleep(settings.report_stream_poll_interval)
+
+
+# Result fields relayed by the state event stream as workflow nodes finish
+STATE_EVENT_FIELDS = ("web_results", "document_results", "analysis", "final_report")
+
+_state_encoder = msgspec.json.Encoder(enc_hook=str)
+
+
+@app.get("/api/research/{query_id}/events")
+async def stream_research_state(query_id: str):
+    """
+    Stream research results as server-sent events as each workflow step finishes.
+    
+    The first event carries every result available so far, so clients that
+    connect late catch up; later events carry only the fields that changed.
+    
+    Args:
+        query_id: The research query ID
+        
+    Returns:
+        Event stream of "update" events with changed result fields, then a
+        "done" event with the final status
+    """
+    if not await result_store.exists(query_id):
+        raise HTTPException(status_code=404, detail="Research query not found")
+    
+    return StreamingResponse(
+        _state_events(query_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+async def _state_events(query_id: str) -> AsyncIterator[str]:
+    """Relay changed result fields from the result store until the research finishes."""
+    sent: Dict[str, bytes] = {}
+    while True:
+        result = await result_store.get(query_id) or {}
+        status = result.get("status", "unknown")
+
+        # Each field is encoded once per poll; changed fields are spliced
+        # into the event as already-encoded JSON
+        changed = {}
+        for field in STATE_EVENT_FIELDS:
+            encoded = _state_encoder.encode(result.get(field))
+            if sent.get(field) != encoded:
+                sent[field] = encoded
+                changed[field] = msgspec.Raw(encoded)
+        if changed:
+            yield f"event: update\ndata: {_state_encoder.encode(changed).decode()}\n\n"
+
+        if status != "running":
+            yield f"event: done\ndata: {json.dumps(status)}\n\n"
+            return
+
+        await asyncio.sleep(settings.report_stream_poll_interval)
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,105 @@
+"""
+In-process caching helpers for agent results.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Bounded LRU cache with per-entry expiry for coroutine results.
+
+    Concurrent misses for the same key share a single in-flight call, and
+    calls that raise are never cached. Calls still in flight when clear()
+    runs are not cached either, since they may reflect the old data.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped by clear(); results of calls started before then are dropped
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a fresh cached value, or default if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Return the cached value for key, computing it with factory on a miss.
+
+        Args:
+            key: Cache key
+            factory: Zero-argument callable returning the awaitable to run on a miss
+            cache_if: Optional predicate; results it rejects are returned but not stored
+
+        Returns:
+            The cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda done: self._store(key, done, cache_if, generation))
+
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Drop all cached entries, and keep calls already in flight from being stored."""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(
+        self,
+        key: Hashable,
+        task: asyncio.Future,
+        cache_if: Optional[Callable[[Any], bool]],
+        generation: int
+    ) -> None:
+        """Move a finished in-flight call into the cache if it succeeded since the last clear()."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if generation != self._generation or task.cancelled() or task.exception() is not None:
+            return
+
+        value = task.result()
+        if cache_if is None or cache_if(value):
+            self.set(key, value)
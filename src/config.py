@@ -2,7 +2,8 @@
 Configuration management for the research agent.
 """
 import os
-from typing import Literal
+from functools import lru_cache
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -28,19 +29,45 @@ class Settings(BaseSettings):
     pinecone_environment: str = os.getenv("PINECONE_ENVIRONMENT", "")
     pinecone_index_name: str = os.getenv("PINECONE_INDEX_NAME", "research-docs")
 
+    # Embeddings (reduced dimensions shrink the index; must match the index dimension)
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "models/gemini-embedding-001")
+    embedding_dimensions: Optional[int] = None
+    embedding_cache_size: int = 1024
+    embedding_cache_ttl: int = 86400  # 24 hours
+
+    # Faster model for the report outline drafted while sources are analyzed
+    outline_model: str = os.getenv("OUTLINE_MODEL", "models/gemini-2.5-flash")
+
+    # Redis Configuration (shared research state; in-memory if unset)
+    redis_url: str = os.getenv("REDIS_URL", "")
+    research_result_ttl: int = 86400  # 24 hours
+    report_stream_poll_interval: float = 0.1
+
     # FastAPI Configuration
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     api_port: int = int(os.getenv("API_PORT", 8000))
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
 
     # Application Settings
     max_search_results: int = 5
     max_tokens_per_response: int = 4096
     research_timeout: int = 300  # 5 minutes
+    max_concurrent_research: int = 4
+    max_concurrent_llm_calls: int = 4
+    max_batch_concurrency: int = 4
+    analysis_shard_size: int = 8
+    analysis_shard_concurrency: int = 4
+    index_batch_size: int = 64
+    index_concurrency: int = 4
+    search_cache_size: int = 1024
+    search_cache_ttl: int = 3600  # 1 hour
+    llm_cache_size: int = 256
+    llm_cache_ttl: int = 86400  # 24 hours
 
     @property
     def database_url(self) -> str:
-        """Get the database URL for SQLAlchemy."""
-        return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+        """Get the async (asyncpg) database URL for SQLAlchemy."""
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
     class Config:
         env_file = ".env"
@@ -48,3 +75,48 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+@lru_cache(maxsize=None)
+def gemini_chat(model: str, api_key: str, temperature: float):
+    """
+    Get the shared Gemini chat model for a model name, API key and temperature.
+    
+    Each chat model owns its own HTTP connection pool, so agents share one
+    instance per configuration. The temperature is set on the model itself
+    because older langchain-google-genai releases ignore call-time overrides.
+    
+    Args:
+        model: Gemini model name
+        api_key: Google API key
+        temperature: Sampling temperature
+        
+    Returns:
+        ChatGoogleGenerativeAI instance, created on first use
+    """
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    except ImportError:
+        raise ImportError(
+            "langchain-google-genai is not installed. "
+            "Install with: pip install langchain-google-genai"
+        )
+
+    return ChatGoogleGenerativeAI(model=model, google_api_key=api_key, temperature=temperature)
+
+
+@lru_cache(maxsize=1)
+def google_embeddings():
+    """Get the shared Gemini embeddings client for the configured model, creating it on first use."""
+    try:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    except ImportError:
+        raise ImportError(
+            "langchain-google-genai is not installed. "
+            "Install with: pip install langchain-google-genai"
+        )
+
+    return GoogleGenerativeAIEmbeddings(
+        model=settings.embedding_model,
+        google_api_key=settings.google_api_key
+    )
@@ -2,9 +2,10 @@
 Database models for storing research data.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, create_engine
+from typing import AsyncIterator
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from src.config import settings
 
 Base = declarative_base()
@@ -52,20 +53,18 @@ class ResearchReport(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
-# Database engine and session
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Database engine and session (async, so DB I/O never blocks the event loop)
+engine = create_async_engine(settings.database_url)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 
-def init_db():
+async def init_db():
     """Initialize the database by creating all tables."""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 
-def get_db_session():
+async def get_db_session() -> AsyncIterator[AsyncSession]:
     """Get a database session."""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,103 @@
+"""
+Exact-match cache for LLM-backed agent results.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import hashlib
+
+import msgspec
+
+from src.cache import AsyncTTLCache
+
+_encoder = msgspec.json.Encoder(enc_hook=str)
+# Sorted keys, so equal payloads always hash to the same key
+_key_encoder = msgspec.json.Encoder(enc_hook=str, order="sorted")
+
+
+def make_cache_key(namespace: str, payload: Dict[str, Any]) -> str:
+    """
+    Build a stable cache key from a namespace and a JSON-serializable payload.
+    
+    Args:
+        namespace: Kind of cached result (e.g. "analysis"), kept readable in the key
+        payload: Everything the cached result depends on
+        
+    Returns:
+        Key of the form "<namespace>:<sha256 of the payload>"
+    """
+    return f"{namespace}:{hashlib.sha256(_key_encoder.encode(payload)).hexdigest()}"
+
+
+class LLMCache(ABC):
+    """Abstract base class for LLM result caches."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None on a miss."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Cache a result."""
+        pass
+
+    async def close(self) -> None:
+        """Release any resources held by the cache."""
+        pass
+
+
+class InMemoryLLMCache(LLMCache):
+    """Process-local LLM cache with LRU eviction and expiry."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        """Initialize in-memory cache."""
+        self._cache = AsyncTTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None on a miss."""
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Cache a result."""
+        self._cache.set(key, value)
+
+
+class RedisLLMCache(LLMCache):
+    """Redis-backed LLM cache shared by all API workers."""
+
+    def __init__(self, url: str, ttl: int, key_prefix: str = "llm-cache:"):
+        """Initialize Redis cache."""
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError("redis is not installed. Install with: pip install redis")
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None on a miss."""
+        value = await self.client.get(f"{self.key_prefix}{key}")
+        return msgspec.json.decode(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Cache a result."""
+        await self.client.set(
+            f"{self.key_prefix}{key}",
+            _encoder.encode(value),
+            ex=self.ttl
+        )
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self.client.aclose()
+
+
+def get_llm_cache() -> LLMCache:
+    """Get the configured LLM cache (Redis if REDIS_URL is set, else in-memory)."""
+    from src.config import settings
+
+    if settings.redis_url:
+        return RedisLLMCache(url=settings.redis_url, ttl=settings.llm_cache_ttl)
+    return InMemoryLLMCache(maxsize=settings.llm_cache_size, ttl=settings.llm_cache_ttl)
@@ -0,0 +1,37 @@
+"""
+Logging setup for the research agent.
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def setup_logging(level: str = "INFO") -> QueueListener:
+    """
+    Route application logs through a queue drained by a background thread.
+    
+    Log calls on the event loop only enqueue the record; formatting and
+    writing to stderr happen on the listener thread.
+    
+    Args:
+        level: Root log level name
+        
+    Returns:
+        Started QueueListener; call stop() on shutdown to flush pending records
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+    ))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -16,7 +16,9 @@ def run_api():
         "src.api:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True
+        reload=True,
+        # "auto" picks uvloop when it is installed, asyncio otherwise
+        loop="auto"
     )
 
 
@@ -32,8 +34,12 @@ def run_streamlit():
 def run_research(query: str):
     """Run a single research query."""
     import asyncio
+    from src.config import settings
+    from src.logging_config import setup_logging
     from src.orchestrator import ResearchOrchestrator
     
+    log_listener = setup_logging(settings.log_level)
+
     async def main():
         orchestrator = ResearchOrchestrator()
         result = await orchestrator.run_research(query)
@@ -52,7 +58,17 @@ def run_research(query: str):
         if result.get('final_report'):
             print(f"\n--- Final Report ---\n{result['final_report'].get('content', '')}")
     
-    asyncio.run(main())
+    try:
+        try:
+            # uvloop is not available on Windows; fall back to the default loop
+            import uvloop
+        except ImportError:
+            asyncio.run(main())
+        else:
+            uvloop.run(main())
+    finally:
+        # Flush log records still queued for the listener thread
+        log_listener.stop()
 
 
 def main():
@@ -1,28 +1,51 @@
 """
 LangGraph orchestration for the research agent workflow.
 """
-from typing import Dict, Any, List, TypedDict, Annotated
-from datetime import datetime
+from typing import Dict, Any, List, Set, Tuple, TypedDict, Annotated, AsyncIterator, Awaitable, Callable, Optional, cast
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import logging
+import operator
 import uuid
 
-from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
 
 from src.agents.web_search_agent import WebSearchAgent
 from src.agents.document_agent import DocumentAgent
 from src.agents.analysis_agent import AnalysisAgent
 from src.agents.writer_agent import WriterAgent
 from src.config import settings
+from src.llm_cache import get_llm_cache, make_cache_key
+
+UTC = timezone.utc
+
+logger = logging.getLogger(__name__)
+
+# State fields the retrieval nodes publish themselves, before their analysis
+RETRIEVAL_FIELDS = ("web_results", "document_results")
 
 
 class ResearchState(TypedDict):
-    """State for the research workflow."""
+    """
+    State for the research workflow.
+
+    Nodes return only the fields they produce; LangGraph applies each update
+    to the shared state, so untouched fields are never copied between steps.
+    """
 
     query: str
     query_id: str
-    web_results: List[Dict[str, Any]]
-    document_results: List[Dict[str, Any]]
+    # Filled by the parallel retrieval branches, so updates are merged, not replaced
+    web_results: Annotated[List[Dict[str, Any]], operator.add]
+    document_results: Annotated[List[Dict[str, Any]], operator.add]
+    # One analysis per retrieval branch, produced as soon as that branch finishes
+    partial_analyses: Annotated[List[Dict[str, Any]], operator.add]
     analysis: Dict[str, Any]
+    # Drafted from the source titles while the sources are analyzed
+    outline: str
     final_report: Dict[str, Any]
     status: str
     timestamp: str
@@ -31,17 +54,26 @@ class ResearchState(TypedDict):
 class ResearchOrchestrator:
     """Orchestrates the research workflow using LangGraph."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize the research orchestrator with LangGraph workflow."""
+        # Bound concurrent Gemini calls across all in-flight research runs;
+        # the analysis agent holds a permit per call, shard calls included
+        self._llm_semaphore = asyncio.Semaphore(settings.max_concurrent_llm_calls)
+
         self.web_agent = WebSearchAgent(api_key=settings.tavily_api_key)
         self.doc_agent = DocumentAgent()
-        self.analysis_agent = AnalysisAgent(api_key=settings.google_api_key)
+        self.analysis_agent = AnalysisAgent(
+            api_key=settings.google_api_key,
+            llm_semaphore=self._llm_semaphore
+        )
         self.writer_agent = WriterAgent(api_key=settings.google_api_key)
+        # Analysis and report results for inputs seen before
+        self.llm_cache = get_llm_cache()
         
         # Build the LangGraph workflow
         self.workflow = self._build_workflow()
 
-    def _build_workflow(self) -> StateGraph:
+    def _build_workflow(self) -> CompiledStateGraph:
         """
         Build the LangGraph workflow for research orchestration.
         
@@ -55,116 +87,345 @@ class ResearchOrchestrator:
         workflow.add_node("web_search", self._run_web_search)
         workflow.add_node("document_retrieval", self._run_document_retrieval)
         workflow.add_node("analysis", self._run_analysis)
+        workflow.add_node("draft_outline", self._run_draft_outline)
         workflow.add_node("write_report", self._run_write_report)
         
-        # Define the workflow edges
-        workflow.set_entry_point("web_search")
-        workflow.add_edge("web_search", "document_retrieval")
-        workflow.add_edge("document_retrieval", "analysis")
-        workflow.add_edge("analysis", "write_report")
+        # Define the workflow edges; each retrieval node analyzes its own
+        # sources before finishing, so one branch's analysis overlaps the
+        # other branch's retrieval. LangGraph only starts a node once the
+        # whole previous step is done, so this cannot be split into
+        # separate retrieval and analysis nodes. The analysis step then
+        # combines the two, while the report outline is drafted in the same
+        # step so that it only holds up the report.
+        workflow.add_edge(START, "web_search")
+        workflow.add_edge(START, "document_retrieval")
+        workflow.add_edge(["web_search", "document_retrieval"], "analysis")
+        workflow.add_edge(["web_search", "document_retrieval"], "draft_outline")
+        workflow.add_edge(["analysis", "draft_outline"], "write_report")
         workflow.add_edge("write_report", END)
         
         # Compile the workflow
         return workflow.compile()
 
-    async def run_research(self, query: str) -> Dict[str, Any]:
+    async def run_research(
+        self,
+        query: str,
+        on_report_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_node_update: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
         """
         Run the complete research workflow using LangGraph.
         
         Args:
             query: The research query
+            on_report_chunk: Optional callback awaited with each final report
+                chunk as the writer generates it
+            on_node_update: Optional callback awaited with the node name and
+                the state fields it produced as each node finishes
             
         Returns:
             Dictionary with final report and all intermediate results
         """
         # Initialize state
-        query_id = str(uuid.uuid4())
+        query_id = uuid.uuid4().hex
         initial_state: ResearchState = {
             "query": query,
             "query_id": query_id,
             "web_results": [],
             "document_results": [],
+            "partial_analyses": [],
             "analysis": {},
+            "outline": "",
             "final_report": {},
             "status": "initialized",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds")
         }
 
         try:
             # Execute the LangGraph workflow
-            print(f"Starting LangGraph research workflow for: {query}")
-            final_state = await self.workflow.ainvoke(initial_state)
+            logger.info("Starting research workflow %s for: %s", query_id, query)
+            final_state: Dict[str, Any] = dict(initial_state)
+            # With several stream modes each item is a (mode, payload) pair
+            stream = cast(AsyncIterator[Tuple[str, Dict[str, Any]]], self.workflow.astream(
+                initial_state,
+                config={"configurable": {
+                    "on_report_chunk": on_report_chunk,
+                    "on_node_update": on_node_update,
+                    # Keys of the web sources, set once web search returns, so the
+                    # document branch skips them whichever branch finishes first
+                    "web_source_keys": asyncio.get_running_loop().create_future()
+                }},
+                stream_mode=["updates", "values"]
+            ))
+            async for mode, chunk in stream:
+                if mode == "values":
+                    final_state = chunk
+                elif on_node_update is not None:
+                    for node, update in chunk.items():
+                        # Retrieval nodes already published their results before analyzing them
+                        remaining = {
+                            field: value for field, value in update.items()
+                            if field not in RETRIEVAL_FIELDS
+                        }
+                        if remaining:
+                            await on_node_update(node, remaining)
             final_state["status"] = "completed"
             return final_state
             
         except Exception as e:
-            print(f"Error in LangGraph workflow: {str(e)}")
-            initial_state["status"] = f"error: {str(e)}"
-            return initial_state
+            logger.exception("Error in research workflow %s", query_id)
+            return {**initial_state, "status": f"error: {str(e)}"}
+
+    async def retrieve_batch(self, queries: List[str]) -> None:
+        """
+        Run web search and document retrieval for several queries at once.
+        
+        Documents for all queries are embedded in one request and web
+        searches run concurrently. Results land in the agents' search
+        caches, so research runs for these queries start from them.
+        
+        Args:
+            queries: The research queries
+        """
+        unique = list(dict.fromkeys(queries))
+        await asyncio.gather(
+            self.web_agent.abatch(unique),
+            self.doc_agent.abatch(unique)
+        )
 
-    async def _run_web_search(self, state: ResearchState) -> ResearchState:
-        """Run web search step (LangGraph node)."""
+    async def _run_web_search(
+        self,
+        state: ResearchState,
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """Run web search, then publish and analyze its results (LangGraph node)."""
         try:
-            print(f"[LangGraph Node] Web search for: {state['query']}")
+            logger.debug("Web search for: %s", state["query"])
             result = await self.web_agent.process(state["query"])
-            state["web_results"] = result.get("results", [])
-            print(f"[LangGraph Node] Found {len(state['web_results'])} web results")
-        except Exception as e:
-            print(f"Web search error: {str(e)}")
-            state["web_results"] = []
-        
-        return state
+            web_results = result.get("results", [])
+            logger.info("Found %d web results", len(web_results))
+        except Exception:
+            logger.exception("Web search error")
+            web_results = []
+
+        # Claim the web sources before analyzing them, so the document branch
+        # only waits for this search, not for its analysis
+        claimed: Set[str] = set()
+        sources = _dedupe_sources(web_results, claimed)
+        web_source_keys = config.get("configurable", {}).get("web_source_keys")
+        if web_source_keys is not None and not web_source_keys.done():
+            web_source_keys.set_result(claimed)
+
+        await _publish(config, "web_search", {"web_results": web_results})
+        return {
+            "web_results": web_results,
+            **await self._analyze_branch("web_results", sources)
+        }
 
-    async def _run_document_retrieval(self, state: ResearchState) -> ResearchState:
-        """Run document retrieval step (LangGraph node)."""
+    async def _run_document_retrieval(
+        self,
+        state: ResearchState,
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """Run document retrieval, then publish and analyze the documents (LangGraph node)."""
         try:
-            print(f"[LangGraph Node] Document retrieval for: {state['query']}")
+            logger.debug("Document retrieval for: %s", state["query"])
             result = await self.doc_agent.process(state["query"])
-            state["document_results"] = result.get("results", [])
-            print(f"[LangGraph Node] Found {len(state['document_results'])} documents")
+            document_results = result.get("results", [])
+            logger.info("Found %d documents", len(document_results))
+        except Exception:
+            logger.exception("Document retrieval error")
+            document_results = []
+
+        await _publish(config, "document_retrieval", {"document_results": document_results})
+
+        # Documents the web search also returned are analyzed with the web
+        # results, so each branch's sources (and cache key) are the same on reruns
+        web_source_keys = config.get("configurable", {}).get("web_source_keys")
+        claimed: Set[str] = set(await web_source_keys) if web_source_keys is not None else set()
+        return {
+            "document_results": document_results,
+            **await self._analyze_branch("document_results", _dedupe_sources(document_results, claimed))
+        }
+
+    async def _analyze_branch(self, source_type: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze the deduplicated sources of one retrieval branch, reusing cached analyses."""
+        if not sources:
+            return {"partial_analyses": []}
+
+        try:
+            logger.debug("Analyzing %d %s", len(sources), source_type)
+            cache_key = make_cache_key("analysis", {
+                "sources": [
+                    {field: source.get(field) for field in ("title", "url", "content")}
+                    for source in sources
+                ]
+            })
+            analysis = await self.llm_cache.get(cache_key)
+            if analysis is None:
+                analysis = await self.analysis_agent.process(sources)
+                if analysis.get("status") == "completed":
+                    await self.llm_cache.set(cache_key, analysis)
         except Exception as e:
-            print(f"Document retrieval error: {str(e)}")
-            state["document_results"] = []
-        
-        return state
+            logger.exception("Analysis error")
+            analysis = {"error": str(e), "status": "error"}
 
-    async def _run_analysis(self, state: ResearchState) -> ResearchState:
-        """Run analysis step (LangGraph node)."""
+        return {"partial_analyses": [{**analysis, "source_type": source_type}]}
+
+    async def _run_analysis(self, state: ResearchState) -> Dict[str, Any]:
+        """Run analysis step, combining the per-branch analyses (LangGraph node)."""
         try:
-            print(f"[LangGraph Node] Analyzing collected information")
-            # Combine all sources
-            all_sources = state["web_results"] + state["document_results"]
-            
-            if all_sources:
-                result = await self.analysis_agent.process(all_sources)
-                state["analysis"] = result
-                print(f"[LangGraph Node] Analysis completed with {len(all_sources)} sources")
+            logger.debug("Combining analyses")
+            # Branches finish in either order; sort so combined inputs are stable
+            partials = sorted(
+                (partial for partial in state["partial_analyses"] if partial.get("status") == "completed"),
+                key=lambda partial: partial["source_type"]
+            )
+
+            if len(partials) > 1:
+                texts = [partial.get("analysis", "") for partial in partials]
+                sources_count = sum(partial.get("sources_count", 0) for partial in partials)
+                cache_key = make_cache_key("combined-analysis", {"partials": texts})
+                analysis = await self.llm_cache.get(cache_key)
+                if analysis is None:
+                    analysis = await self.analysis_agent.combine(texts, sources_count)
+                    if analysis.get("status") == "completed":
+                        await self.llm_cache.set(cache_key, analysis)
+                logger.info("Analysis completed with %d sources", sources_count)
+            elif partials:
+                analysis = {key: value for key, value in partials[0].items() if key != "source_type"}
+                logger.info("Analysis completed with %d sources", analysis.get("sources_count", 0))
+            elif state["partial_analyses"]:
+                analysis = {
+                    key: value for key, value in state["partial_analyses"][0].items()
+                    if key != "source_type"
+                }
+                logger.warning("Analysis failed")
             else:
-                state["analysis"] = {
+                analysis = {
                     "analysis": "No sources found for analysis",
                     "status": "completed"
                 }
-                print(f"[LangGraph Node] No sources available for analysis")
+                logger.info("No sources available for analysis")
         except Exception as e:
-            print(f"Analysis error: {str(e)}")
-            state["analysis"] = {"error": str(e), "status": "error"}
+            logger.exception("Analysis error")
+            analysis = {"error": str(e), "status": "error"}
+        
+        return {"analysis": analysis}
+
+    async def _run_draft_outline(self, state: ResearchState) -> Dict[str, Any]:
+        """Draft the report outline from the source titles (LangGraph node)."""
+        seen: Set[str] = set()
+        sources = _dedupe_sources(state["web_results"], seen) + _dedupe_sources(state["document_results"], seen)
+        titles: List[str] = [
+            source.get("title") or source["url"]
+            for source in sources if source.get("title") or source.get("url")
+        ]
+        if not titles:
+            return {"outline": ""}
+
+        try:
+            logger.debug("Drafting report outline from %d sources", len(titles))
+            cache_key = make_cache_key("outline", {"query": state["query"], "titles": titles})
+            cached = await self.llm_cache.get(cache_key)
+            if cached is not None:
+                return {"outline": cached["outline"]}
+
+            async with self._llm_semaphore:
+                outline = await self.writer_agent.draft_outline(state["query"], titles)
+            if outline:
+                await self.llm_cache.set(cache_key, {"outline": outline})
+        except Exception:
+            # The outline is only a hint; the report is written without one
+            logger.exception("Outline drafting error")
+            outline = ""
         
-        return state
+        return {"outline": outline}
 
-    async def _run_write_report(self, state: ResearchState) -> ResearchState:
+    async def _run_write_report(
+        self,
+        state: ResearchState,
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
         """Run write report step (LangGraph node)."""
         try:
-            print(f"[LangGraph Node] Generating final report")
-            result = await self.writer_agent.process(
-                query=state["query"],
-                analysis=state["analysis"].get("analysis", ""),
-                sources=state["document_results"],
-                web_results=state["web_results"]
-            )
-            state["final_report"] = result
-            print(f"[LangGraph Node] Report generation completed")
+            logger.debug("Generating final report")
+            analysis = state["analysis"].get("analysis", "")
+            # Report on the same deduplicated sources the analysis saw
+            seen: Set[str] = set()
+            web_results = _dedupe_sources(state["web_results"], seen)
+            document_results = _dedupe_sources(state["document_results"], seen)
+            cache_key = make_cache_key("report", {
+                "query": state["query"],
+                "analysis": analysis,
+                "outline": state["outline"],
+                "sources_count": len(document_results),
+                "web_results_count": len(web_results)
+            })
+            on_chunk = config.get("configurable", {}).get("on_report_chunk")
+            final_report = await self.llm_cache.get(cache_key)
+            if final_report is None:
+                async with self._llm_semaphore:
+                    final_report = await self.writer_agent.process(
+                        query=state["query"],
+                        analysis=analysis,
+                        sources=document_results,
+                        web_results=web_results,
+                        on_chunk=on_chunk,
+                        outline=state["outline"]
+                    )
+                if final_report.get("status") == "completed":
+                    await self.llm_cache.set(cache_key, final_report)
+            elif on_chunk is not None:
+                # Cached reports are relayed to streaming clients in one chunk
+                await on_chunk(final_report.get("content", ""))
+            logger.info("Report generation completed")
         except Exception as e:
-            print(f"Report writing error: {str(e)}")
-            state["final_report"] = {"error": str(e), "status": "error"}
+            logger.exception("Report writing error")
+            final_report = {"error": str(e), "status": "error"}
+        
+        return {"final_report": final_report}
+
+
+async def _publish(config: RunnableConfig, node: str, update: Dict[str, Any]) -> None:
+    """Send a node's fields to the run's on_node_update callback ahead of the node finishing."""
+    on_node_update = config.get("configurable", {}).get("on_node_update")
+    if on_node_update is not None:
+        await on_node_update(node, update)
+
+
+def _dedupe_sources(
+    sources: List[Dict[str, Any]],
+    seen: Optional[Set[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Drop sources already seen, keeping the first occurrence.
+    
+    A source is a duplicate if its URL or a hash of the start of its
+    whitespace-normalized content was seen before, so a web article also
+    matches an indexed copy of it that has no URL.
+    
+    Args:
+        sources: Web or document results
+        seen: Keys of sources already kept; updated in place so several
+            lists can be deduplicated against each other
         
-        return state
+    Returns:
+        Sources in their original order without duplicates
+    """
+    if seen is None:
+        seen = set()
+
+    unique = []
+    for source in sources:
+        keys = []
+        if source.get("url"):
+            keys.append(f"url:{source['url']}")
+        content = " ".join(source.get("content", "").split())[:512]
+        if content:
+            keys.append("content:" + hashlib.sha256(content.encode("utf-8")).hexdigest())
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        unique.append(source)
+    return unique
@@ -0,0 +1,172 @@
+"""
+Storage for research task state shared between API handlers and workers.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, cast
+
+import msgspec
+
+# Values that are not JSON types (e.g. datetimes in metadata) are stored as strings
+_encoder = msgspec.json.Encoder(enc_hook=str)
+
+
+class ResultStore(ABC):
+    """Abstract base class for research result stores."""
+
+    @abstractmethod
+    async def create(self, query_id: str, state: Dict[str, Any]) -> None:
+        """Store the initial state of a research query."""
+        pass
+
+    @abstractmethod
+    async def update(self, query_id: str, fields: Dict[str, Any]) -> None:
+        """Update individual fields of a research query's state."""
+        pass
+
+    @abstractmethod
+    async def get(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """Get the state of a research query, or None if unknown."""
+        pass
+
+    @abstractmethod
+    async def append_report_chunk(self, query_id: str, chunk: str) -> None:
+        """Append a chunk of the final report as it is generated."""
+        pass
+
+    @abstractmethod
+    async def get_report_chunks(self, query_id: str, start: int = 0) -> List[str]:
+        """Get the report chunks generated so far, from index start onwards."""
+        pass
+
+    async def get_status(self, query_id: str) -> Optional[str]:
+        """Get only the status of a research query, or None if unknown."""
+        result = await self.get(query_id)
+        return result.get("status") if result is not None else None
+
+    async def exists(self, query_id: str) -> bool:
+        """Check whether a research query is known."""
+        return await self.get(query_id) is not None
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+        pass
+
+
+class InMemoryResultStore(ResultStore):
+    """Process-local result store, suitable for a single worker."""
+
+    def __init__(self):
+        """Initialize in-memory store."""
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._report_chunks: Dict[str, List[str]] = {}
+
+    async def create(self, query_id: str, state: Dict[str, Any]) -> None:
+        """Store the initial state of a research query."""
+        self._results[query_id] = dict(state)
+
+    async def update(self, query_id: str, fields: Dict[str, Any]) -> None:
+        """Update individual fields of a research query's state."""
+        self._results.setdefault(query_id, {}).update(fields)
+
+    async def get(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """Get the state of a research query, or None if unknown."""
+        result = self._results.get(query_id)
+        return dict(result) if result is not None else None
+
+    async def get_status(self, query_id: str) -> Optional[str]:
+        """Get only the status of a research query, or None if unknown."""
+        result = self._results.get(query_id)
+        return result.get("status") if result is not None else None
+
+    async def append_report_chunk(self, query_id: str, chunk: str) -> None:
+        """Append a chunk of the final report as it is generated."""
+        self._report_chunks.setdefault(query_id, []).append(chunk)
+
+    async def get_report_chunks(self, query_id: str, start: int = 0) -> List[str]:
+        """Get the report chunks generated so far, from index start onwards."""
+        return self._report_chunks.get(query_id, [])[start:]
+
+
+class RedisResultStore(ResultStore):
+    """
+    Redis-backed result store shared by all API workers.
+
+    Each query is a hash with one JSON-encoded value per state field, so
+    partial updates are single HSET calls rather than read-modify-write.
+    """
+
+    def __init__(self, url: str, ttl: int, key_prefix: str = "research:"):
+        """Initialize Redis store."""
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError("redis is not installed. Install with: pip install redis")
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def _key(self, query_id: str) -> str:
+        """Get the Redis key for a research query."""
+        return f"{self.key_prefix}{query_id}"
+
+    async def create(self, query_id: str, state: Dict[str, Any]) -> None:
+        """Store the initial state of a research query."""
+        await self.update(query_id, state)
+
+    async def update(self, query_id: str, fields: Dict[str, Any]) -> None:
+        """Update individual fields of a research query's state."""
+        key = self._key(query_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                field: _encoder.encode(value)
+                for field, value in fields.items()
+            })
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """Get the state of a research query, or None if unknown."""
+        # decode_responses=True makes every key and value a str
+        data = cast(Dict[str, str], await self.client.hgetall(self._key(query_id)))
+        if not data:
+            return None
+        return {field: msgspec.json.decode(value) for field, value in data.items()}
+
+    async def get_status(self, query_id: str) -> Optional[str]:
+        """Get only the status of a research query, or None if unknown."""
+        # One HGET instead of fetching and decoding every result field
+        value = await self.client.hget(self._key(query_id), "status")
+        return msgspec.json.decode(value) if value is not None else None
+
+    async def append_report_chunk(self, query_id: str, chunk: str) -> None:
+        """Append a chunk of the final report as it is generated."""
+        key = f"{self._key(query_id)}:report"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, chunk)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get_report_chunks(self, query_id: str, start: int = 0) -> List[str]:
+        """Get the report chunks generated so far, from index start onwards."""
+        return cast(List[str], await self.client.lrange(f"{self._key(query_id)}:report", start, -1))
+
+    async def exists(self, query_id: str) -> bool:
+        """Check whether a research query is known."""
+        return bool(await self.client.exists(self._key(query_id)))
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self.client.aclose()
+
+
+def get_result_store() -> ResultStore:
+    """Get the configured result store (Redis if REDIS_URL is set, else in-memory)."""
+    from src.config import settings
+
+    if settings.redis_url:
+        return RedisResultStore(
+            url=settings.redis_url,
+            ttl=settings.research_result_ttl
+        )
+    return InMemoryResultStore()
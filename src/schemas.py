@@ -13,6 +13,12 @@ class ResearchQueryRequest(BaseModel):
     max_results: Optional[int] = Field(5, description="Maximum number of results per agent")
 
 
+class ResearchBatchRequest(BaseModel):
+    """Request model for a batch of research queries."""
+
+    queries: List[str] = Field(..., min_length=1, description="The research queries")
+
+
 class ResearchResultItem(BaseModel):
     """Item in research results."""
 
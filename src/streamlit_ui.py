@@ -5,7 +5,7 @@ import streamlit as st
 import asyncio
 from datetime import datetime
 import json
-import requests
+import httpx
 import time
 
 st.set_page_config(
@@ -42,6 +42,15 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+
+
+@st.cache_resource
+def get_api_client(base_url: str) -> httpx.Client:
+    """Get an HTTP client for the API, reusing its connection pool across reruns."""
+    # No read timeout so event streams can stay open for a whole research run
+    return httpx.Client(base_url=base_url, timeout=httpx.Timeout(30.0, read=None))
+
+
 # Title
 st.title("🔍 Autonomous Research Agent")
 st.markdown("Multi-Agent Research System with LangGraph Orchestration")
@@ -107,8 +116,8 @@ if search_button and research_query:
     # Make API call to start research
     with st.spinner("🚀 Starting research task..."):
         try:
-            response = requests.post(
-                f"{api_url}/api/research",
+            response = get_api_client(api_url).post(
+                "/api/research",
                 json={"query": research_query}
             )
             
@@ -123,121 +132,150 @@ if search_button and research_query:
             st.error(f"Error connecting to API: {str(e)}")
             st.session_state.show_results = False
 
+def iter_sse_events(response):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    event, data_lines = "message", []
+    for line in response.iter_lines():
+        if line:
+            field, _, value = line.partition(":")
+            if field == "event":
+                event = value.strip()
+            elif field == "data":
+                data_lines.append(value.lstrip())
+        elif data_lines:
+            yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+
+
+def render_web_results(web_results):
+    """Render the web search results tab."""
+    st.subheader("Web Search Results")
+    
+    if web_results:
+        st.success(f"✓ Found {len(web_results)} web sources")
+        
+        for i, result in enumerate(web_results, 1):
+            # Check if it's an error result
+            if result.get("error"):
+                st.error(f"Error: {result.get('error')}")
+            else:
+                with st.expander(f"Result {i}: {result.get('title', 'No title')}"):
+                    st.markdown(f"**Source:** {result.get('url', 'N/A')}")
+                    st.markdown(f"**Score:** {result.get('score', 'N/A')}")
+                    st.markdown(f"**Content:** {result.get('content', 'No content available')}")
+    else:
+        st.info("No web results yet. Research may still be in progress.")
+
+
+def render_document_results(doc_results):
+    """Render the document retrieval results tab."""
+    st.subheader("Document Retrieval Results")
+    
+    if doc_results:
+        st.success(f"✓ Retrieved {len(doc_results)} documents")
+        
+        for i, doc in enumerate(doc_results, 1):
+            # Check if it's an error result
+            if doc.get("error"):
+                st.error(f"Error: {doc.get('error')}")
+            else:
+                with st.expander(f"Document {i}: {doc.get('title', 'No title')}"):
+                    st.markdown(f"**Score:** {doc.get('score', 'N/A')}")
+                    st.markdown(f"**Content:** {doc.get('content', 'No content available')}")
+                    if doc.get('metadata'):
+                        st.markdown(f"**Metadata:** {doc.get('metadata')}")
+    else:
+        st.info("No document results yet. Research may still be in progress.")
+
+
+def render_analysis(analysis):
+    """Render the analysis tab."""
+    st.subheader("Analysis and Synthesis")
+    
+    if analysis:
+        st.markdown("### Key Findings:")
+        st.markdown(analysis.get("key_findings", "No key findings available"))
+        
+        if analysis.get("confidence"):
+            st.markdown(f"**Confidence Level:** {analysis.get('confidence')}")
+    else:
+        st.info("Analysis not yet available. Research may still be in progress.")
+
+
+def render_final_report(final_report):
+    """Render the final report tab."""
+    st.subheader("Final Research Report")
+    
+    if final_report:
+        st.markdown(final_report.get("content", "No report content available"))
+        
+        # Download buttons
+        if final_report.get("content"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="📄 Download Report (MD)",
+                    data=final_report.get("content", ""),
+                    file_name=f"research_report_{st.session_state.query_id}.md",
+                    mime="text/markdown"
+                )
+    else:
+        st.info("Final report not yet generated. Research may still be in progress.")
+
+
+# Result fields and the functions rendering their tabs
+RESULT_RENDERERS = {
+    "web_results": render_web_results,
+    "document_results": render_document_results,
+    "analysis": render_analysis,
+    "final_report": render_final_report
+}
+
+
 # Display results if available
 if hasattr(st.session_state, 'show_results') and st.session_state.show_results:
     st.divider()
     
-    # Add refresh button
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        st.info("💡 Click 'Refresh Results' to check the latest status")
-    with col2:
-        if st.button("🔄 Refresh Results", key="refresh_btn"):
-            st.rerun()
-    
-    # Poll for results
     if hasattr(st.session_state, 'query_id'):
-        with st.spinner("🔄 Fetching results..."):
-            try:
-                response = requests.get(f"{api_url}/api/research/{st.session_state.query_id}")
-                
+        status_placeholder = st.empty()
+        status_placeholder.warning("⏳ Research in progress... Results appear as each step finishes.")
+        
+        # Tabs for different results, redrawn as state updates arrive
+        tabs = st.tabs([
+            "📊 Web Results",
+            "📄 Documents",
+            "🧠 Analysis",
+            "📋 Final Report"
+        ])
+        placeholders = {}
+        for tab, field in zip(tabs, RESULT_RENDERERS):
+            with tab:
+                placeholders[field] = st.empty()
+        
+        try:
+            # The API replays results produced so far, then streams the rest
+            with get_api_client(api_url).stream(
+                "GET",
+                f"/api/research/{st.session_state.query_id}/events"
+            ) as response:
                 if response.status_code == 200:
-                    data = response.json()
-                    status = data.get("status", "unknown")
-                    
-                    # Show status
-                    if status == "running":
-                        st.warning("⏳ Research in progress... Click 'Refresh Results' to see updates.")
-                    elif status == "completed":
-                        st.success("✅ Research completed!")
-                    elif status.startswith("error"):
-                        st.error(f"❌ Research failed: {status}")
-                    
-                    # Tabs for different results
-                    tab1, tab2, tab3, tab4 = st.tabs([
-                        "📊 Web Results",
-                        "📄 Documents",
-                        "🧠 Analysis",
-                        "📋 Final Report"
-                    ])
-                    
-                    with tab1:
-                        st.subheader("Web Search Results")
-                        web_results = data.get("web_results", [])
-                        
-                        if web_results:
-                            st.success(f"✓ Found {len(web_results)} web sources")
-                            
-                            for i, result in enumerate(web_results, 1):
-                                # Check if it's an error result
-                                if result.get("error"):
-                                    st.error(f"Error: {result.get('error')}")
-                                else:
-                                    with st.expander(f"Result {i}: {result.get('title', 'No title')}"):
-                                        st.markdown(f"**Source:** {result.get('url', 'N/A')}")
-                                        st.markdown(f"**Score:** {result.get('score', 'N/A')}")
-                                        st.markdown(f"**Content:** {result.get('content', 'No content available')}")
-                        else:
-                            st.info("No web results yet. Research may still be in progress.")
-                    
-                    with tab2:
-                        st.subheader("Document Retrieval Results")
-                        doc_results = data.get("document_results", [])
-                        
-                        if doc_results:
-                            st.success(f"✓ Retrieved {len(doc_results)} documents")
-                            
-                            for i, doc in enumerate(doc_results, 1):
-                                # Check if it's an error result
-                                if doc.get("error"):
-                                    st.error(f"Error: {doc.get('error')}")
-                                else:
-                                    with st.expander(f"Document {i}: {doc.get('title', 'No title')}"):
-                                        st.markdown(f"**Score:** {doc.get('score', 'N/A')}")
-                                        st.markdown(f"**Content:** {doc.get('content', 'No content available')}")
-                                        if doc.get('metadata'):
-                                            st.markdown(f"**Metadata:** {doc.get('metadata')}")
-                        else:
-                            st.info("No document results yet. Research may still be in progress.")
-                    
-                    with tab3:
-                        st.subheader("Analysis and Synthesis")
-                        analysis = data.get("analysis")
-                        
-                        if analysis:
-                            st.markdown("### Key Findings:")
-                            st.markdown(analysis.get("key_findings", "No key findings available"))
-                            
-                            if analysis.get("confidence"):
-                                st.markdown(f"**Confidence Level:** {analysis.get('confidence')}")
-                        else:
-                            st.info("Analysis not yet available. Research may still be in progress.")
-                    
-                    with tab4:
-                        st.subheader("Final Research Report")
-                        final_report = data.get("final_report")
-                        
-                        if final_report:
-                            st.markdown(final_report.get("content", "No report content available"))
-                            
-                            # Download buttons
-                            if final_report.get("content"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.download_button(
-                                        label="📄 Download Report (MD)",
-                                        data=final_report.get("content", ""),
-                                        file_name=f"research_report_{st.session_state.query_id}.md",
-                                        mime="text/markdown"
-                                    )
-                        else:
-                            st.info("Final report not yet generated. Research may still be in progress.")
-                        
+                    for event, data in iter_sse_events(response):
+                        if event == "update":
+                            for field, value in data.items():
+                                with placeholders[field].container():
+                                    RESULT_RENDERERS[field](value)
+                        elif event == "done":
+                            if data == "completed":
+                                status_placeholder.success("✅ Research completed!")
+                            elif data.startswith("error"):
+                                status_placeholder.error(f"❌ Research failed: {data}")
+                            else:
+                                status_placeholder.info(f"Research status: {data}")
                 else:
-                    st.error(f"Failed to fetch results: {response.text}")
+                    st.error(f"Failed to fetch results: {response.read().decode()}")
                     
-            except Exception as e:
-                st.error(f"Error fetching results: {str(e)}")
+        except Exception as e:
+            st.error(f"Error fetching results: {str(e)}")
     else:
         st.warning("No active research query. Please start a new research task.")
 
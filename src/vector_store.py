@@ -2,21 +2,45 @@
 Vector store abstraction for handling embeddings.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from array import array
+from typing import List, Dict, Any, Optional
+import asyncio
+import math
 import os
 
+from src.cache import AsyncTTLCache
+from src.config import google_embeddings, settings
+
+# Pinecone recommends upserting at most 100 vectors per request
+UPSERT_BATCH_SIZE = 100
+
 
 class VectorStore(ABC):
     """Abstract base class for vector stores."""
 
     @abstractmethod
-    async def add_documents(self, texts: List[str], metadatas: List[Dict]) -> List[str]:
-        """Add documents to the vector store."""
+    async def add_documents(
+        self,
+        texts: List[str],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Add documents to the vector store, optionally under explicit IDs."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        k: int = 5,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """Search for documents similar to the query, optionally pre-filtered on metadata."""
         pass
 
     @abstractmethod
-    async def search(self, query: str, k: int = 5) -> List[Dict]:
-        """Search for documents similar to the query."""
+    async def search_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """Search for documents similar to each query in a batch."""
         pass
 
     @abstractmethod
@@ -26,7 +50,12 @@ class VectorStore(ABC):
 
 
 class PineconeStore(VectorStore):
-    """Pinecone-based vector store."""
+    """
+    Pinecone-based vector store.
+
+    Embeddings are L2-normalized on write and query, so cosine similarity
+    equals the dot product and the index may use the cheaper dotproduct metric.
+    """
 
     def __init__(self, api_key: str, environment: str, index_name: str):
         """Initialize Pinecone store."""
@@ -37,59 +66,133 @@ class PineconeStore(VectorStore):
 
         self.pc = Pinecone(api_key=api_key)
         self.index = self.pc.Index(index_name)
+        # Query embeddings by query text; repeated queries skip the embeddings API
+        self.query_embeddings_cache = AsyncTTLCache(
+            maxsize=settings.embedding_cache_size,
+            ttl=settings.embedding_cache_ttl
+        )
 
-    async def add_documents(self, texts: List[str], metadatas: List[Dict]) -> List[str]:
-        """Add documents to Pinecone."""
-        from langchain_google_genai import GoogleGenerativeAIEmbeddings
-        from src.config import settings
-
-        embeddings = GoogleGenerativeAIEmbeddings(google_api_key=settings.google_api_key)
-        doc_ids = [f"doc_{i}" for i in range(len(texts))]
+    def _get_embeddings(self):
+        """Get the shared Gemini embeddings client, creating it on first use."""
+        return google_embeddings()
+
+    async def add_documents(
+        self,
+        texts: List[str],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Add documents to Pinecone, embedding them in batched requests."""
+        doc_ids = ids if ids is not None else [f"doc_{i}" for i in range(len(texts))]
+        # Passed per call: older langchain-google-genai releases have no
+        # output_dimensionality field on the embeddings client
+        document_embeddings = await self._get_embeddings().aembed_documents(
+            texts,
+            output_dimensionality=settings.embedding_dimensions
+        )
         
         vectors = []
-        for doc_id, text, metadata in zip(doc_ids, texts, metadatas):
-            embedding = embeddings.embed_query(text)
+        for doc_id, text, metadata, embedding in zip(doc_ids, texts, metadatas, document_embeddings):
             vectors.append({
                 "id": doc_id,
-                "values": embedding,
+                "values": _normalize(embedding),
                 "metadata": {"text": text, **metadata}
             })
         
-        self.index.upsert(vectors=vectors)
+        # Upsert in request-sized chunks, sent concurrently from worker threads
+        await asyncio.gather(*(
+            asyncio.to_thread(self.index.upsert, vectors=vectors[start:start + UPSERT_BATCH_SIZE])
+            for start in range(0, len(vectors), UPSERT_BATCH_SIZE)
+        ))
         return doc_ids
 
-    async def search(self, query: str, k: int = 5) -> List[Dict]:
-        """Search Pinecone for similar documents."""
-        from langchain_google_genai import GoogleGenerativeAIEmbeddings
-        from src.config import settings
-
-        embeddings = GoogleGenerativeAIEmbeddings(google_api_key=settings.google_api_key)
-        query_embedding = embeddings.embed_query(query)
+    async def search(
+        self,
+        query: str,
+        k: int = 5,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """Search Pinecone for similar documents, filtering metadata server-side."""
+        async def embed_query() -> array:
+            embedding = await self._get_embeddings().aembed_query(
+                query,
+                output_dimensionality=settings.embedding_dimensions
+            )
+            return _compact(embedding)
+
+        query_embedding = await self.query_embeddings_cache.get_or_set(query, embed_query)
         
-        results = self.index.query(
-            vector=query_embedding,
+        return await self._query(query_embedding.tolist(), k, where_filter)
+
+    async def search_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """Search Pinecone for several queries, embedding the uncached ones in one request."""
+        missing = [
+            query for query in dict.fromkeys(queries)
+            if self.query_embeddings_cache.get(query) is None
+        ]
+        if missing:
+            embeddings = await self._get_embeddings().aembed_documents(
+                missing,
+                task_type="RETRIEVAL_QUERY",
+                output_dimensionality=settings.embedding_dimensions
+            )
+            for query, embedding in zip(missing, embeddings):
+                self.query_embeddings_cache.set(query, _compact(embedding))
+
+        # Pinecone takes one vector per query request; these now hit the embedding cache
+        return list(await asyncio.gather(*(self.search(query, k) for query in queries)))
+
+    async def _query(
+        self,
+        vector: List[float],
+        k: int,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """Query the Pinecone index with a single, already normalized embedding."""
+        results = await asyncio.to_thread(
+            self.index.query,
+            vector=vector,
             top_k=k,
+            filter=where_filter,
             include_metadata=True
         )
         
-        return [
-            {
-                "content": match.metadata.get("text", ""),
-                "metadata": {k: v for k, v in match.metadata.items() if k != "text"},
+        matches = []
+        for match in results.matches:
+            # Split the stored text off a shallow copy rather than rebuilding the dict key by key
+            metadata = dict(match.metadata or {})
+            matches.append({
+                "content": metadata.pop("text", ""),
+                "metadata": metadata,
                 "score": match.score
-            }
-            for match in results.matches
-        ]
+            })
+        return matches
 
     async def delete(self, doc_ids: List[str]) -> None:
         """Delete documents from Pinecone."""
-        self.index.delete(ids=doc_ids)
+        await asyncio.to_thread(self.index.delete, ids=doc_ids)
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit L2 norm (zero vectors are returned unchanged)."""
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return list(vector)
+    return [value / norm for value in vector]
+
+
+def _compact(vector: List[float]) -> array:
+    """
+    Normalize a query embedding and pack it as float32 for caching.
+    
+    A packed 3072-d vector takes about 12 KB, against about 98 KB as a
+    list of Python floats.
+    """
+    return array("f", _normalize(vector))
 
 
 def get_vector_store() -> VectorStore:
     """Get the configured vector store instance (Pinecone)."""
-    from src.config import settings
-
     return PineconeStore(
         api_key=settings.pinecone_api_key,
         environment=settings.pinecone_environment,
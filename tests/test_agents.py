@@ -8,7 +8,9 @@ from src.agents.web_search_agent import WebSearchAgent
 from src.agents.document_agent import DocumentAgent
 from src.agents.analysis_agent import AnalysisAgent
 from src.agents.writer_agent import WriterAgent
+from src.config import gemini_chat, settings
 from src.orchestrator import ResearchOrchestrator
+from src.vector_store import PineconeStore
 
 
 class TestWebSearchAgent:
@@ -21,10 +23,10 @@ class TestWebSearchAgent:
     @pytest.mark.asyncio
     async def test_search_web_success(self, agent):
         """Test successful web search."""
-        with patch('tavily.TavilyClient') as mock_client:
+        with patch('tavily.AsyncTavilyClient') as mock_client:
             mock_instance = MagicMock()
             mock_client.return_value = mock_instance
-            mock_instance.search.return_value = {
+            mock_instance.search = AsyncMock(return_value={
                 "results": [
                     {
                         "title": "Test Result",
@@ -32,12 +34,23 @@ class TestWebSearchAgent:
                         "content": "Test content"
                     }
                 ]
-            }
+            })
             
             results = await agent.search_web("test query", num_results=5)
             assert len(results) > 0
             assert "title" in results[0]
 
+    @pytest.mark.asyncio
+    async def test_as_tool(self, agent):
+        """Test the tool wrapper forwards to the bound search_web method."""
+        with patch.object(agent, '_search_tavily', new_callable=AsyncMock) as mock_search:
+            mock_search.return_value = [{"title": "Test"}]
+            
+            tool = agent.as_tool()
+            results = await tool.ainvoke({"query": "test query", "num_results": 3})
+            assert results == [{"title": "Test"}]
+            mock_search.assert_awaited_once_with("test query", 3)
+
     @pytest.mark.asyncio
     async def test_process(self, agent):
         """Test process method."""
@@ -50,6 +63,16 @@ class TestWebSearchAgent:
             assert result["agent_type"] == "web_search"
             assert result["status"] == "completed"
 
+    @pytest.mark.asyncio
+    async def test_abatch(self, agent):
+        """Test batch processing keeps results in query order."""
+        with patch.object(agent, '_search_tavily', new_callable=AsyncMock) as mock_search:
+            mock_search.side_effect = lambda query, num_results: [{"title": query}]
+            
+            results = await agent.abatch(["first", "second"])
+            assert [r["query"] for r in results] == ["first", "second"]
+            assert results[1]["results"] == [{"title": "second"}]
+
 
 class TestDocumentAgent:
     """Tests for DocumentAgent."""
@@ -70,6 +93,44 @@ class TestDocumentAgent:
             assert len(results) > 0
             assert "content" in results[0]
 
+    @pytest.mark.asyncio
+    async def test_search_documents_cached(self, agent):
+        """Test repeated searches are served from the cache but failures are not."""
+        with patch.object(agent.vector_store, 'search', new_callable=AsyncMock) as mock_search:
+            mock_search.side_effect = RuntimeError("unavailable")
+            results = await agent.search_documents("test query")
+            assert "error" in results[0]
+
+            mock_search.side_effect = None
+            mock_search.return_value = [
+                {"content": "Test doc", "metadata": {}, "score": 0.9}
+            ]
+            await agent.search_documents("test query")
+            results = await agent.search_documents("test query")
+            assert results[0]["content"] == "Test doc"
+            assert mock_search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_in_flight_during_indexing_not_cached(self, agent):
+        """Test a search started before indexing is not cached after it."""
+        release = asyncio.Event()
+
+        async def slow_search(query, k, where_filter):
+            await release.wait()
+            return [{"content": "Old doc", "metadata": {}, "score": 0.9}]
+
+        with patch.object(agent.vector_store, 'search', side_effect=slow_search) as mock_search, \
+             patch.object(agent.vector_store, 'add_documents', new_callable=AsyncMock) as mock_add:
+            mock_add.side_effect = lambda texts, metadatas, ids: ids
+            pending = asyncio.ensure_future(agent.search_documents("test query"))
+            await asyncio.sleep(0)
+
+            await agent.index_documents(["New doc"], [{}])
+            release.set()
+            await pending
+            await agent.search_documents("test query")
+            assert mock_search.call_count == 2
+
     @pytest.mark.asyncio
     async def test_process(self, agent):
         """Test process method."""
@@ -82,6 +143,225 @@ class TestDocumentAgent:
             assert result["agent_type"] == "document_retrieval"
             assert result["status"] == "completed"
 
+    @pytest.mark.asyncio
+    async def test_index_documents_batches(self, agent):
+        """Test indexing splits documents into batches with stable IDs."""
+        with patch('src.agents.document_agent.settings') as mock_settings, \
+             patch.object(agent.vector_store, 'add_documents', new_callable=AsyncMock) as mock_add:
+            mock_settings.index_batch_size = 2
+            mock_settings.index_concurrency = 2
+            mock_add.side_effect = lambda texts, metadatas, ids: ids
+            
+            doc_ids = await agent.index_documents(
+                ["a", "b", "c"],
+                [{"n": 1}, {"n": 2}, {"n": 3}]
+            )
+            assert doc_ids == ["doc_0", "doc_1", "doc_2"]
+            assert mock_add.await_count == 2
+            mock_add.assert_any_await(["c"], [{"n": 3}], ids=["doc_2"])
+
+    @pytest.mark.asyncio
+    async def test_abatch_fills_search_cache(self, agent):
+        """Test a batch issues one vector store batch search and caches its results."""
+        agent.vector_store.search_batch = AsyncMock(return_value=[
+            [{"content": "First", "metadata": {}, "score": 0.9}],
+            [{"content": "Second", "metadata": {}, "score": 0.8}]
+        ])
+        agent.vector_store.search = AsyncMock(return_value=[])
+
+        results = await agent.abatch(["first", "second", "first"])
+        assert [r["query"] for r in results] == ["first", "second", "first"]
+        assert results[1]["results"][0]["content"] == "Second"
+        agent.vector_store.search_batch.assert_awaited_once_with(["first", "second"], k=5)
+
+        cached = await agent.search_documents("second")
+        assert cached[0]["content"] == "Second"
+        agent.vector_store.search.assert_not_awaited()
+
+
+class TestPineconeStore:
+    """Tests for PineconeStore."""
+
+    @pytest.fixture
+    def store(self):
+        with patch.dict('sys.modules', {'pinecone': MagicMock()}):
+            store = PineconeStore(api_key="test_key", environment="test", index_name="test")
+        store.index.query.return_value = MagicMock(matches=[])
+        return store
+
+    @pytest.mark.asyncio
+    async def test_embedding_dimensions_passed_per_call(self, store):
+        """Test the configured embedding size reaches every embed call."""
+        embeddings = MagicMock()
+        embeddings.aembed_documents = AsyncMock(return_value=[[1.0, 0.0]])
+        embeddings.aembed_query = AsyncMock(return_value=[0.0, 1.0])
+
+        with patch.object(settings, 'embedding_dimensions', 768), \
+             patch.object(store, '_get_embeddings', return_value=embeddings):
+            await store.add_documents(["text"], [{}])
+            await store.search("query")
+
+        embeddings.aembed_documents.assert_awaited_once_with(["text"], output_dimensionality=768)
+        embeddings.aembed_query.assert_awaited_once_with("query", output_dimensionality=768)
+
+    @pytest.mark.asyncio
+    async def test_search_batch_embeds_uncached_queries_once(self, store):
+        """Test a batch search embeds only uncached queries, in a single request."""
+        embeddings = MagicMock()
+        embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+        embeddings.aembed_documents = AsyncMock(return_value=[[0.0, 2.0], [3.0, 4.0]])
+
+        with patch.object(store, '_get_embeddings', return_value=embeddings):
+            await store.search("cached")
+            results = await store.search_batch(["cached", "second", "third", "second"])
+
+        assert len(results) == 4
+        embeddings.aembed_query.assert_awaited_once()
+        embeddings.aembed_documents.assert_awaited_once_with(
+            ["second", "third"],
+            task_type="RETRIEVAL_QUERY",
+            output_dimensionality=settings.embedding_dimensions
+        )
+        assert store.index.query.call_count == 5
+        assert store.index.query.call_args.kwargs["vector"] == pytest.approx([0.0, 1.0])
+
+
+class TestAnalysisAgent:
+    """Tests for AnalysisAgent."""
+
+    @pytest.fixture
+    def agent(self):
+        return AnalysisAgent(api_key="test_key")
+
+    @pytest.mark.asyncio
+    async def test_llm_created_once(self, agent):
+        """Test one Gemini client is shared across analyze calls and agents."""
+        gemini_chat.cache_clear()
+        try:
+            with patch('langchain_google_genai.ChatGoogleGenerativeAI') as mock_llm_cls:
+                mock_llm_cls.return_value.ainvoke = AsyncMock(return_value=MagicMock(content="Insights"))
+                
+                await agent.analyze([{"content": "First"}])
+                result = await agent.analyze([{"content": "Second"}])
+                AnalysisAgent(api_key="test_key")._get_llm()
+                assert result["analysis"] == "Insights"
+                assert mock_llm_cls.call_count == 1
+        finally:
+            gemini_chat.cache_clear()
+
+    def test_llm_temperatures_reach_request(self, agent):
+        """Test each agent's temperature is in the generation config sent to Gemini."""
+        gemini_chat.cache_clear()
+        try:
+            writer = WriterAgent(api_key="test_key")
+            for llm, temperature in [
+                (agent._get_llm(), 0.5),
+                (writer._get_llm(), 0.7),
+                (writer._get_outline_llm(), 0.3)
+            ]:
+                assert llm._prepare_params(None).temperature == pytest.approx(temperature)
+        finally:
+            gemini_chat.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_analyze_large_source_list_map_reduce(self, agent):
+        """Test large source lists are analyzed in shards and then combined."""
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(return_value=MagicMock(content="Insights"))
+        sources = [{"content": f"Source {i}"} for i in range(5)]
+
+        with patch('src.agents.analysis_agent.settings') as mock_settings, \
+             patch.object(agent, '_get_llm', return_value=llm):
+            mock_settings.analysis_shard_size = 2
+            mock_settings.analysis_shard_concurrency = 2
+            
+            result = await agent.analyze(sources)
+            assert result["analysis"] == "Insights"
+            assert result["sources_count"] == 5
+            # Three shards plus one reduce call
+            assert llm.ainvoke.await_count == 4
+            reduce_messages = llm.ainvoke.await_args_list[-1].args[0]
+            assert "Partial analysis 3:" in reduce_messages[1].content
+
+    @pytest.mark.asyncio
+    async def test_shard_calls_share_llm_semaphore(self):
+        """Test shard calls each take a permit of the shared LLM semaphore."""
+        agent = AnalysisAgent(api_key="test_key", llm_semaphore=asyncio.Semaphore(1))
+        running = []
+        peak = []
+
+        async def fake_ainvoke(messages):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0)
+            running.pop()
+            return MagicMock(content="Insights")
+
+        llm = MagicMock()
+        llm.ainvoke = fake_ainvoke
+
+        with patch('src.agents.analysis_agent.settings') as mock_settings, \
+             patch.object(agent, '_get_llm', return_value=llm):
+            mock_settings.analysis_shard_size = 1
+            mock_settings.analysis_shard_concurrency = 4
+            
+            result = await agent.analyze([{"content": f"Source {i}"} for i in range(4)])
+            assert result["analysis"] == "Insights"
+            # Four shard calls and the reduce call, one at a time
+            assert len(peak) == 5
+            assert max(peak) == 1
+
+    @pytest.mark.asyncio
+    async def test_combine(self, agent):
+        """Test partial analyses are combined by one reduce call."""
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(return_value=MagicMock(content="Combined"))
+
+        with patch.object(agent, '_get_llm', return_value=llm):
+            result = await agent.combine(["Web insights", "Document insights"], sources_count=7)
+            assert result["analysis"] == "Combined"
+            assert result["sources_count"] == 7
+            reduce_messages = llm.ainvoke.await_args.args[0]
+            assert "Partial analysis 2:\nDocument insights" in reduce_messages[1].content
+
+    def test_prepare_context(self, agent):
+        """Test context formatting skips missing fields and truncates content."""
+        context = agent._prepare_context([
+            {"title": "Title", "url": "https://example.com", "content": "x" * 600},
+            {"content": "Short"}
+        ])
+        assert context == (
+            "\nSource 1:\nTitle: Title\nURL: https://example.com\nContent: " + "x" * 500 + "..."
+            "\n\nSource 2:\nContent: Short..."
+        )
+
+
+class TestWriterAgent:
+    """Tests for WriterAgent."""
+
+    @pytest.fixture
+    def agent(self):
+        return WriterAgent(api_key="test_key")
+
+    @pytest.mark.asyncio
+    async def test_write_report_streams_chunks(self, agent):
+        """Test report chunks are relayed as generated and joined into the report."""
+        async def fake_astream(messages):
+            for text in ["Executive ", "Summary"]:
+                yield MagicMock(content=text)
+
+        llm = MagicMock()
+        llm.astream = fake_astream
+        received = []
+
+        async def on_chunk(chunk):
+            received.append(chunk)
+
+        with patch.object(agent, '_get_llm', return_value=llm):
+            result = await agent.write_report("test query", "analysis", [], [], on_chunk=on_chunk)
+            assert received == ["Executive ", "Summary"]
+            assert result["content"] == "Executive Summary"
+
 
 class TestResearchOrchestrator:
     """Tests for ResearchOrchestrator."""
@@ -116,6 +396,263 @@ class TestResearchOrchestrator:
             assert result["status"] == "completed"
             assert result["query"] == "test query"
 
+    @pytest.mark.asyncio
+    async def test_retrieval_runs_concurrently(self, orchestrator):
+        """Test web search and document retrieval overlap instead of running in sequence."""
+        both_started = asyncio.Event()
+        started = []
+
+        def fake_process(name):
+            async def process(query):
+                started.append(name)
+                if len(started) == 2:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+                return {"results": [{"content": name}]}
+            return process
+
+        orchestrator.web_agent.process = fake_process("web")
+        orchestrator.doc_agent.process = fake_process("doc")
+        orchestrator.analysis_agent.process = AsyncMock(
+            side_effect=lambda sources: {"analysis": sources[0]["content"], "status": "completed"}
+        )
+        orchestrator.analysis_agent.combine = AsyncMock(return_value={"analysis": "Combined"})
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+
+        result = await orchestrator.run_research("test query")
+        assert result["web_results"] == [{"content": "web"}]
+        assert result["document_results"] == [{"content": "doc"}]
+        # Each branch is analyzed on its own, then the analyses are combined
+        assert orchestrator.analysis_agent.process.await_count == 2
+        assert orchestrator.analysis_agent.combine.await_args.args[0] == ["doc", "web"]
+        assert result["analysis"]["analysis"] == "Combined"
+
+    @pytest.mark.asyncio
+    async def test_branch_analysis_overlaps_other_retrieval(self, orchestrator):
+        """Test web results are analyzed while document retrieval is still running."""
+        web_analysis_started = asyncio.Event()
+
+        async def doc_process(query):
+            # Only finishes once the web branch has moved on to analysis
+            await asyncio.wait_for(web_analysis_started.wait(), timeout=1)
+            return {"results": [{"content": "doc"}]}
+
+        async def analysis_process(sources):
+            if sources[0]["content"] == "web":
+                web_analysis_started.set()
+            return {"analysis": sources[0]["content"], "status": "completed"}
+
+        orchestrator.web_agent.process = AsyncMock(return_value={"results": [{"content": "web"}]})
+        orchestrator.doc_agent.process = doc_process
+        orchestrator.analysis_agent.process = analysis_process
+        orchestrator.analysis_agent.combine = AsyncMock(return_value={"analysis": "Combined"})
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+
+        result = await orchestrator.run_research("test query")
+        assert result["document_results"] == [{"content": "doc"}]
+        assert result["analysis"]["analysis"] == "Combined"
+
+    @pytest.mark.asyncio
+    async def test_retrieval_results_published_before_analysis(self, orchestrator):
+        """Test each branch's results reach on_node_update once, before its analysis."""
+        events = []
+
+        async def analysis_process(sources):
+            events.append(("analysis", sources[0]["content"]))
+            return {"analysis": sources[0]["content"], "status": "completed"}
+
+        async def on_node_update(node, update):
+            events.extend(("update", field) for field in update)
+
+        orchestrator.web_agent.process = AsyncMock(return_value={"results": [{"content": "web"}]})
+        orchestrator.doc_agent.process = AsyncMock(return_value={"results": [{"content": "doc"}]})
+        orchestrator.analysis_agent.process = analysis_process
+        orchestrator.analysis_agent.combine = AsyncMock(return_value={"analysis": "Combined"})
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+
+        await orchestrator.run_research("test query", on_node_update=on_node_update)
+        assert events.count(("update", "web_results")) == 1
+        assert events.count(("update", "document_results")) == 1
+        assert events.index(("update", "web_results")) < events.index(("analysis", "web"))
+        assert events.index(("update", "document_results")) < events.index(("analysis", "doc"))
+
+    @pytest.mark.asyncio
+    async def test_shared_sources_analyzed_with_web_results(self, orchestrator):
+        """Test a source in both branches goes to the web analysis even if documents return first."""
+        web_released = asyncio.Event()
+
+        async def web_process(query):
+            await asyncio.wait_for(web_released.wait(), timeout=1)
+            return {"results": [{"url": "https://example.com", "content": "Shared text"}]}
+
+        async def doc_process(query):
+            web_released.set()
+            return {"results": [{"content": "Shared text"}, {"content": "Doc only"}]}
+
+        orchestrator.web_agent.process = web_process
+        orchestrator.doc_agent.process = doc_process
+        orchestrator.analysis_agent.process = AsyncMock(return_value={
+            "analysis": "Test analysis", "status": "completed"
+        })
+        orchestrator.analysis_agent.combine = AsyncMock(return_value={"analysis": "Combined"})
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+
+        await orchestrator.run_research("test query")
+        analyzed = sorted(
+            [source["content"] for source in call.args[0]]
+            for call in orchestrator.analysis_agent.process.await_args_list
+        )
+        assert analyzed == [["Doc only"], ["Shared text"]]
+        web_sources = [
+            call.args[0] for call in orchestrator.analysis_agent.process.await_args_list
+            if call.args[0][0].get("url")
+        ]
+        assert web_sources == [[{"url": "https://example.com", "content": "Shared text"}]]
+
+    @pytest.mark.asyncio
+    async def test_llm_results_cached(self, orchestrator):
+        """Test repeated research with the same sources reuses analysis and report."""
+        orchestrator.web_agent.process = AsyncMock(return_value={
+            "results": [{"title": "Test", "url": "https://example.com", "content": "Test"}]
+        })
+        orchestrator.doc_agent.process = AsyncMock(return_value={"results": []})
+        orchestrator.analysis_agent.process = AsyncMock(return_value={
+            "analysis": "Test analysis", "status": "completed"
+        })
+        orchestrator.writer_agent.process = AsyncMock(return_value={
+            "content": "Test report", "status": "completed"
+        })
+        orchestrator.writer_agent.draft_outline = AsyncMock(return_value="1. Executive Summary")
+        received = []
+
+        async def on_report_chunk(chunk):
+            received.append(chunk)
+
+        await orchestrator.run_research("test query")
+        result = await orchestrator.run_research("test query", on_report_chunk=on_report_chunk)
+        assert result["final_report"]["content"] == "Test report"
+        assert orchestrator.analysis_agent.process.await_count == 1
+        assert orchestrator.writer_agent.process.await_count == 1
+        assert orchestrator.writer_agent.draft_outline.await_count == 1
+        assert received == ["Test report"]
+
+    @pytest.mark.asyncio
+    async def test_analysis_skips_duplicate_sources(self, orchestrator):
+        """Test sources duplicated within or across retrieval branches are analyzed once."""
+        orchestrator.web_agent.process = AsyncMock(return_value={"results": [
+            {"url": "https://example.com", "content": "Linked"},
+            {"url": "https://example.com", "content": "Linked again"},
+            {"url": "https://example.org", "content": "Shared text"}
+        ]})
+        orchestrator.doc_agent.process = AsyncMock(return_value={"results": [
+            {"content": "Shared  text"},
+            {"content": "Other text"},
+            {"content": "Other   text"}
+        ]})
+        orchestrator.analysis_agent.process = AsyncMock(return_value={
+            "analysis": "Test analysis", "status": "completed"
+        })
+        orchestrator.analysis_agent.combine = AsyncMock(return_value={"analysis": "Combined"})
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+        orchestrator.writer_agent.draft_outline = AsyncMock(return_value="")
+
+        await orchestrator.run_research("test query")
+        analyzed = [
+            " ".join(source["content"].split())
+            for call in orchestrator.analysis_agent.process.await_args_list
+            for source in call.args[0]
+        ]
+        assert sorted(analyzed) == ["Linked", "Other text", "Shared text"]
+
+    @pytest.mark.asyncio
+    async def test_report_skips_document_copies_of_web_sources(self, orchestrator):
+        """Test an indexed copy of a web article is matched by content despite having no URL."""
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+        state = {
+            "query": "test query",
+            "analysis": {"analysis": "Test analysis"},
+            "outline": "",
+            "web_results": [{"url": "https://example.com", "content": "Shared article text"}],
+            "document_results": [
+                {"content": "Shared  article\ntext", "metadata": {}},
+                {"content": "Other text", "metadata": {}}
+            ]
+        }
+
+        await orchestrator._run_write_report(state, {})
+        kwargs = orchestrator.writer_agent.process.await_args.kwargs
+        assert [source["content"] for source in kwargs["web_results"]] == ["Shared article text"]
+        assert [source["content"] for source in kwargs["sources"]] == ["Other text"]
+
+    @pytest.mark.asyncio
+    async def test_nodes_return_only_their_fields(self, orchestrator):
+        """Test each node updates only the state fields it owns."""
+        orchestrator.web_agent.process = AsyncMock(return_value={
+            "results": [{"title": "Web", "content": "web"}]
+        })
+        orchestrator.doc_agent.process = AsyncMock(return_value={"results": []})
+        orchestrator.analysis_agent.process = AsyncMock(return_value={
+            "analysis": "Test analysis", "status": "completed"
+        })
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+        orchestrator.writer_agent.draft_outline = AsyncMock(return_value="1. Executive Summary")
+        updates = {}
+
+        async def on_node_update(node, update):
+            updates.setdefault(node, set()).update(update)
+
+        result = await orchestrator.run_research("test query", on_node_update=on_node_update)
+        assert updates == {
+            "web_search": {"web_results", "partial_analyses"},
+            "document_retrieval": {"document_results", "partial_analyses"},
+            "analysis": {"analysis"},
+            "draft_outline": {"outline"},
+            "write_report": {"final_report"}
+        }
+        # Appending reducers must not duplicate results across steps
+        assert result["web_results"] == [{"title": "Web", "content": "web"}]
+        # The outline drafted alongside the analyses reaches the writer
+        assert orchestrator.writer_agent.draft_outline.await_args.args == ("test query", ["Web"])
+        assert orchestrator.writer_agent.process.await_args.kwargs["outline"] == "1. Executive Summary"
+
+    @pytest.mark.asyncio
+    async def test_outline_does_not_delay_combine(self, orchestrator):
+        """Test the analyses are combined while the outline is still being drafted."""
+        combine_started = asyncio.Event()
+
+        async def combine(texts, sources_count):
+            combine_started.set()
+            return {"analysis": "Combined", "status": "completed"}
+
+        async def draft_outline(query, titles):
+            await asyncio.wait_for(combine_started.wait(), timeout=1)
+            return "1. Executive Summary"
+
+        orchestrator.web_agent.process = AsyncMock(return_value={
+            "results": [{"title": "Web", "content": "web"}]
+        })
+        orchestrator.doc_agent.process = AsyncMock(return_value={
+            "results": [{"content": "doc"}]
+        })
+        orchestrator.analysis_agent.process = AsyncMock(return_value={
+            "analysis": "Test analysis", "status": "completed"
+        })
+        orchestrator.analysis_agent.combine = combine
+        orchestrator.writer_agent.draft_outline = draft_outline
+        orchestrator.writer_agent.process = AsyncMock(return_value={"content": "Test report"})
+
+        await orchestrator.run_research("test query")
+        assert orchestrator.writer_agent.process.await_args.kwargs["outline"] == "1. Executive Summary"
+
+    @pytest.mark.asyncio
+    async def test_outline_cache_errors_are_not_fatal(self, orchestrator):
+        """Test a failing LLM cache leaves the report without an outline instead of failing the run."""
+        orchestrator.llm_cache = MagicMock()
+        orchestrator.llm_cache.get = AsyncMock(side_effect=ConnectionError("redis down"))
+        state = {"query": "test query", "web_results": [{"title": "Web"}], "document_results": []}
+
+        result = await orchestrator._run_draft_outline(state)
+        assert result == {"outline": ""}
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])